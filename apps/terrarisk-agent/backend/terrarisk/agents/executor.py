@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Literal
+
+from ..models.domain import PlannerStep, StepExecution
+
+StepHandler = Callable[[PlannerStep, Mapping[str, Any]], Any | Awaitable[Any]]
+StepGuard = Callable[[PlannerStep], str | None]
+
+
+class StepDeniedError(PermissionError):
+    """A step was refused by the executor's guard (e.g. a policy decision)."""
+
+
+def build_dependency_graph(steps: Sequence[PlannerStep]) -> dict[str, set[str]]:
+    """Map each step id to the step ids it consumes; non-step inputs are ignored."""
+    step_ids = {step.id for step in steps}
+    if len(step_ids) != len(steps):
+        raise ValueError("Planner steps must have unique ids.")
+    return {step.id: {item for item in step.inputs if item in step_ids} for step in steps}
+
+
+@dataclass
+class PlanRun:
+    executions: list[StepExecution]
+    outputs: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+    def output(self, step_id: str) -> Any:
+        if step_id in self.errors:
+            raise self.errors[step_id]
+        if step_id not in self.outputs:
+            raise KeyError(f"Step {step_id} did not run.")
+        return self.outputs[step_id]
+
+
+@dataclass
+class PlanExecutor:
+    """Run planner steps as a DAG, overlapping steps whose inputs are ready.
+
+    Handlers are looked up by ``PlannerStep.source`` and receive the step plus the
+    outputs of its upstream steps. Coroutine handlers are awaited on the loop; plain
+    callables run on worker threads so blocking I/O overlaps too. An optional
+    ``guard`` is consulted before each step; a returned reason marks the step
+    ``denied`` and skips its dependents.
+    """
+
+    handlers: Mapping[str, StepHandler]
+    max_concurrency: int = 8
+    guard: StepGuard | None = None
+
+    async def run(self, steps: Sequence[PlannerStep]) -> PlanRun:
+        graph = build_dependency_graph(steps)
+        sorter = TopologicalSorter(graph)
+        try:
+            sorter.prepare()
+        except CycleError as exc:
+            raise ValueError(f"Planner steps contain a dependency cycle: {exc.args[1]}") from exc
+
+        by_id = {step.id: step for step in steps}
+        run = PlanRun(executions=[])
+        executions: dict[str, StepExecution] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending: dict[asyncio.Task[None], str] = {}
+
+        while sorter.is_active():
+            for step_id in sorter.get_ready():
+                step = by_id[step_id]
+                failed = [dep for dep in graph[step_id] if dep in run.errors]
+                if failed:
+                    # Dependents carry the root cause so PlanRun.output re-raises the original error.
+                    run.errors[step_id] = run.errors[failed[0]]
+                    executions[step_id] = StepExecution(
+                        step_id=step_id,
+                        source=step.source,
+                        status="skipped",
+                        error=f"Upstream step {failed[0]} failed.",
+                    )
+                    sorter.done(step_id)
+                    continue
+                reason = self.guard(step) if self.guard is not None else None
+                if reason is not None:
+                    run.errors[step_id] = StepDeniedError(f"Step {step_id} ({step.source}) denied: {reason}")
+                    executions[step_id] = StepExecution(
+                        step_id=step_id, source=step.source, status="denied", error=str(run.errors[step_id])
+                    )
+                    sorter.done(step_id)
+                    continue
+                upstream = {dep: run.outputs[dep] for dep in graph[step_id]}
+                task = asyncio.create_task(self._run_step(step, upstream, run, executions, semaphore))
+                pending[task] = step_id
+            if not pending:
+                continue
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                sorter.done(pending.pop(task))
+
+        run.executions = [executions[step.id] for step in steps]
+        return run
+
+    async def _run_step(
+        self,
+        step: PlannerStep,
+        upstream: Mapping[str, Any],
+        run: PlanRun,
+        executions: dict[str, StepExecution],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        handler = self.handlers.get(step.source)
+        status: Literal["succeeded", "failed"]
+        error: str | None
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler registered for step source {step.source!r}.")
+                if inspect.iscoroutinefunction(handler):
+                    result = await handler(step, upstream)
+                else:
+                    result = await asyncio.to_thread(handler, step, upstream)
+            except Exception as exc:  # noqa: BLE001 - kept on the run; PlanRun.output re-raises it
+                run.errors[step.id] = exc
+                status = "failed"
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                run.outputs[step.id] = result
+                status = "succeeded"
+                error = None
+            duration_ms = (time.perf_counter() - started) * 1000
+        executions[step.id] = StepExecution(
+            step_id=step.id,
+            source=step.source,
+            status=status,
+            duration_ms=round(duration_ms, 3),
+            error=error,
+        )
+
+
+_thread_state = threading.local()
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    loop: asyncio.AbstractEventLoop | None = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    return loop
+
+
+def execute_plan(
+    steps: Sequence[PlannerStep],
+    handlers: Mapping[str, StepHandler],
+    *,
+    max_concurrency: int = 8,
+    guard: StepGuard | None = None,
+) -> PlanRun:
+    """Synchronous entry point for callers that are not already inside an event loop.
+
+    Each calling thread keeps one event loop (and its ``to_thread`` pool) for its whole
+    life, so worker threads that run many plans do not build and tear down a loop per
+    plan the way ``asyncio.run`` would.
+    """
+    return _thread_loop().run_until_complete(
+        PlanExecutor(handlers, max_concurrency=max_concurrency, guard=guard).run(steps)
+    )
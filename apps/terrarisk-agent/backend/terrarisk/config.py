@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from functools import lru_cache
 from typing import Literal
 
@@ -19,19 +20,120 @@ class Settings(BaseSettings):
     app_name: str = "TerraRisk Agent (Personal R&D)"
     environment: Literal["local", "staging", "production"] = "local"
     earth_ai_enabled: bool = False
+    earth_ai_plan_cache_ttl_seconds: float = Field(default=3_600.0, gt=0)
+    earth_ai_plan_cache_max_entries: int = Field(default=512, ge=1)
     gcp_project: str | None = Field(default=None, alias="GCP_PROJECT")
     bigquery_dataset: str | None = Field(default=None, alias="BQ_DATASET")
     earthengine_project: str | None = Field(default=None, alias="EARTHENGINE_PROJECT")
+    bigquery_page_size: int = Field(
+        default=10_000,
+        ge=1,
+        description="Rows fetched per page when streaming BigQuery results.",
+    )
+    bigquery_use_storage_api: bool = Field(
+        default=False,
+        description="Download results via the BigQuery Storage Read API (needs google-cloud-bigquery-storage).",
+    )
+    region_stats_boundary_table: str | None = Field(
+        default=None,
+        description="County boundary table joined against region stats during online analyses.",
+    )
+    region_stats_boundary_key: str = "geoid"
+    region_stats_raster_table: str | None = Field(
+        default=None,
+        description="Earth Engine raster table aggregated per county during online analyses; unset to skip.",
+    )
+    region_stats_cache_path: str | None = Field(
+        default=None,
+        description="SQLite file caching BigQuery Earth Engine region stats; unset to disable.",
+    )
+    region_stats_cache_ttl_seconds: float = Field(default=86_400.0, gt=0)
     action_credential_schema_path: str = (
         "packages/schemas/action_credential_v0.json"
     )
+    policy_bundle_path: str = "packages/policies/opa_bundle/policy.rego"
+    policy_enforcement: Literal["off", "warn", "enforce"] = Field(
+        default="enforce",
+        description="Evaluate the OPA bundle in-process before every planner step; warn logs denials, enforce blocks them.",
+    )
+    policy_actor_role: str = Field(
+        default="system",
+        description="Role presented to the policy; the shipped bundle allows cloud and BYO BigQuery runs only for admin.",
+    )
+    credential_validation: Literal["off", "sync", "async"] = Field(
+        default="sync",
+        description="Schema-validate Action Credentials before responses leave run_analysis (async logs only).",
+    )
+    signing_backend: Literal["off", "local"] = Field(
+        default="local",
+        description="Signer for per-run manifests; local uses Ed25519 (ephemeral unless SIGNING_KEY_PATH is set).",
+    )
+    signing_key_path: str | None = None
     artifact_dir: str = Field(
         default="examples/artifacts",
         description="Relative or absolute path where report artifacts are stored.",
     )
+    nri_source_path: str = Field(
+        default="examples/offline_nri.csv",
+        description="NRI CSV or compiled snapshot directory loaded once per process.",
+    )
+    boundary_source_path: str | None = Field(
+        default="examples/offline_counties.geojson",
+        description="County boundary GeoJSON (TIGER-style GEOID/NAMELSAD properties); unset for synthetic points.",
+    )
+    analysis_max_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Worker threads for analysis/report jobs (parsing, rendering, artifact writes).",
+    )
+    analysis_max_queue: int = Field(
+        default=16,
+        ge=0,
+        description="Jobs allowed to wait for a worker before requests are rejected with 429.",
+    )
+    result_cache_max_entries: int = Field(default=256, ge=1)
+    result_cache_ttl_seconds: float = Field(default=900.0, gt=0)
+    result_cache_dir: str | None = Field(
+        default=None,
+        description="Optional directory for the on-disk result cache tier (relative to the package).",
+    )
+    stress_max_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        ge=1,
+        description="Processes used for large Monte Carlo stress runs.",
+    )
+    stress_parallel_threshold: int = Field(
+        default=100_000,
+        ge=1,
+        description="Simulated years at or above which stress runs fan out to the process pool.",
+    )
+    stress_chunk_cell_years: int = Field(
+        default=2_000_000,
+        ge=1,
+        description="Cell-years (simulated years x county-hazard cells) per vectorized chunk; bounds memory.",
+    )
+    scenario_population_source: Literal["nri", "datacommons"] = Field(
+        default="nri",
+        description="Population used by /scenarios: NRI fixture values or live Data Commons counts.",
+    )
+    datacommons_base_url: str = "https://api.datacommons.org"
+    datacommons_api_key: str | None = None
+    datacommons_max_concurrency: int = Field(default=4, ge=1)
+    datacommons_cache_dir: str | None = Field(
+        default=None,
+        description="Optional directory persisting Data Commons population series (relative to the package).",
+    )
     otel_exporter_otlp_endpoint: str | None = Field(
         default=None, alias="OTEL_EXPORTER_OTLP_ENDPOINT"
     )
+    otel_service_name: str = Field(default="terrarisk-backend", alias="OTEL_SERVICE_NAME")
+    otel_traces_sampler_ratio: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of root traces sampled; child spans follow their parent's decision.",
+    )
+    otel_metric_export_interval_ms: int = Field(default=60_000, ge=1_000)
 
 
 @lru_cache(maxsize=1)
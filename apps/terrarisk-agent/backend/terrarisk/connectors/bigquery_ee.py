@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
 from textwrap import dedent
-from typing import Any, Mapping
+from typing import Any
 
+import pandas as pd
 from google.cloud import bigquery
 
 from ..config import get_settings
+from ..utils.telemetry import phase
+from .bq_cache import RegionStatsCache, cache_key
+
+DEFAULT_PAGE_SIZE = 10_000
 
 
 def _infer_bigquery_scalar_type(value: Any) -> str:
@@ -46,13 +56,131 @@ REGION_STATS_TEMPLATE = dedent(
 )
 
 
+@dataclass(frozen=True)
+class RegionStatsRequest:
+    boundary_table: str
+    boundary_key: str
+    raster_table: str
+    stat_name: str = "mean"
+    stat_args: str = "sample_size => 1000"
+
+    @property
+    def tables(self) -> list[str]:
+        return [self.boundary_table, self.raster_table]
+
+    def render(self) -> str:
+        return REGION_STATS_TEMPLATE.format(
+            boundary_table=self.boundary_table,
+            boundary_key=self.boundary_key,
+            raster_table=self.raster_table,
+            stat_name=self.stat_name,
+            stat_args=self.stat_args,
+        )
+
+
+@dataclass
+class BigQueryStubRowIterator:
+    """Single-pass, ``RowIterator``-shaped view over pages of rows."""
+
+    page_source: Iterable[list[dict[str, Any]]]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (row for page in self.page_source for row in page)
+
+    @property
+    def pages(self) -> Iterator[list[dict[str, Any]]]:
+        return iter(self.page_source)
+
+
+@dataclass
+class BigQueryStubJob:
+    """Job-shaped rows that did not come from a live query: stub responses and cache hits.
+
+    ``pages`` streams row pages lazily (a cache read, or a live job being written to the
+    cache) and can be consumed once; without it ``rows`` are paged in memory.
+    """
+
+    query: str
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    pages: Iterable[list[dict[str, Any]]] | None = None
+
+    def result(self, page_size: int | None = None, **_: Any) -> BigQueryStubRowIterator:
+        if self.pages is not None:
+            return BigQueryStubRowIterator(self.pages)
+        size = page_size or max(len(self.rows), 1)
+        return BigQueryStubRowIterator([self.rows[start : start + size] for start in range(0, len(self.rows), size)])
+
+
+@dataclass
+class BigQueryStubTable:
+    table_id: str
+    etag: str
+
+
+@dataclass
+class BigQueryStubClient:
+    """Local stand-in for ``bigquery.Client`` used by tests and offline development.
+
+    ``responses`` maps a substring of the SQL to the rows its job returns; unmatched
+    queries return no rows. Every submitted query is recorded in ``queries``, and
+    ``table_etags`` feeds ``get_table`` so cache invalidation can be exercised.
+    """
+
+    project: str | None = None
+    responses: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    queries: list[str] = field(default_factory=list)
+    table_etags: dict[str, str] = field(default_factory=dict)
+
+    def query(self, sql: str, job_config: Any = None) -> BigQueryStubJob:
+        self.queries.append(sql)
+        rows = next((rows for needle, rows in self.responses.items() if needle in sql), [])
+        return BigQueryStubJob(rows=rows, query=sql)
+
+    def get_table(self, table: str) -> BigQueryStubTable:
+        return BigQueryStubTable(table_id=table, etag=self.table_etags.get(table, "v0"))
+
+
 @dataclass
 class BigQueryEarthEngineClient:
+    """BigQuery Earth Engine connector that reuses one client (and HTTP session) per instance.
+
+    ``client_factory`` builds the underlying client lazily; pass
+    :class:`BigQueryStubClient` (or any callable accepting ``project=``) to run offline.
+    With ``use_storage_api`` and ``google-cloud-bigquery-storage`` installed, result
+    iteration downloads through the BigQuery Storage Read API instead of REST pages.
+    """
+
     project: str
     dataset: str
+    client_factory: Callable[..., Any] = bigquery.Client
+    max_concurrency: int = 8
+    cache: RegionStatsCache | None = None
+    page_size: int = DEFAULT_PAGE_SIZE
+    use_storage_api: bool = False
+    _bq_client: Any = field(default=None, init=False, repr=False)
+    _bqstorage_client: Any = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def _client(self) -> bigquery.Client:
-        return bigquery.Client(project=self.project)
+        if self._bq_client is None:
+            with self._lock:
+                if self._bq_client is None:
+                    self._bq_client = self.client_factory(project=self.project)
+        return self._bq_client
+
+    def _storage_client(self) -> Any | None:
+        if not self.use_storage_api:
+            return None
+        if self._bqstorage_client is None:
+            try:
+                from google.cloud import bigquery_storage  # type: ignore[attr-defined]
+            except ImportError:
+                # Optional dependency; REST paging is slower but equivalent.
+                return None
+            with self._lock:
+                if self._bqstorage_client is None:
+                    self._bqstorage_client = bigquery_storage.BigQueryReadClient()
+        return self._bqstorage_client
 
     def run_region_stats(
         self,
@@ -62,16 +190,121 @@ class BigQueryEarthEngineClient:
         raster_table: str,
         stat_name: str = "mean",
         stat_args: str = "sample_size => 1000",
-    ) -> bigquery.QueryJob:
-        template = REGION_STATS_TEMPLATE.format(
+        refresh: bool = False,
+    ) -> bigquery.QueryJob | BigQueryStubJob:
+        """Submit one region-stats query, or answer it from ``cache`` when one is configured.
+
+        With a cache the request shares the keys and TTL of :meth:`run_region_stats_many`
+        and comes back as a :class:`BigQueryStubJob` whose pages stream either from the
+        cache or from the live job as it is written to the cache; without one the live
+        job is returned.
+        """
+        request = RegionStatsRequest(
             boundary_table=boundary_table,
             boundary_key=boundary_key,
             raster_table=raster_table,
             stat_name=stat_name,
             stat_args=stat_args,
         )
-        job = self._client().query(template)
-        return job
+        if self.cache is None:
+            with phase("bigquery.region_stats.submit", raster_table=raster_table):
+                return self._client().query(request.render())
+        key = self._cache_key(request, self.table_versions(request.tables))
+        pages = None if refresh else self.cache.iter_pages(key)
+        if pages is None:
+            with phase("bigquery.region_stats.submit", raster_table=raster_table):
+                live = self._client().query(request.render())
+            pages = self.cache.store_pages(key, self.iter_pages(live), request.tables)
+        return BigQueryStubJob(query=request.render(), pages=pages)
+
+    def table_versions(self, tables: Sequence[str]) -> dict[str, str]:
+        """Metadata-only lookups (no scan cost) used to key cached results."""
+        client = self._client()
+        with phase("bigquery.table_versions"):
+            return {table: str(client.get_table(table).etag) for table in dict.fromkeys(tables)}
+
+    @staticmethod
+    def _cache_key(request: RegionStatsRequest, versions: Mapping[str, str]) -> str:
+        return cache_key(request.render(), None, {table: versions[table] for table in request.tables})
+
+    def run_region_stats_many(
+        self,
+        requests: Sequence[RegionStatsRequest],
+        *,
+        max_concurrency: int | None = None,
+        refresh: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """Submit every region-stats job up front, then gather their rows in request order.
+
+        With a ``cache``, requests whose SQL and source table versions were already
+        answered within the TTL are served locally and never submitted; ``refresh``
+        bypasses the lookup but still stores the fresh rows.
+        Jobs execute server-side in parallel; the thread pool only overlaps the HTTP
+        round-trips for submission and result polling on the shared client.
+        """
+        if not requests:
+            return []
+        with phase("bigquery.region_stats.batch", requests=len(requests)) as span:
+            results = self._region_stats_many(requests, max_concurrency=max_concurrency, refresh=refresh)
+            span.set_attribute("rows", sum(len(rows) for rows in results))
+        return results
+
+    def _region_stats_many(
+        self,
+        requests: Sequence[RegionStatsRequest],
+        *,
+        max_concurrency: int | None,
+        refresh: bool,
+    ) -> list[list[dict[str, Any]]]:
+        client = self._client()
+        workers = min(max_concurrency or self.max_concurrency, len(requests))
+        results: list[list[dict[str, Any]] | None] = [None] * len(requests)
+        keys: list[str] = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bigquery-ee") as pool:
+            if self.cache is not None:
+                versions = self.table_versions([table for request in requests for table in request.tables])
+                keys = [self._cache_key(request, versions) for request in requests]
+                if not refresh:
+                    results = [self.cache.get(key) for key in keys]
+            pending = [index for index, rows in enumerate(results) if rows is None]
+            jobs = list(pool.map(lambda index: client.query(requests[index].render()), pending))
+            fetched = list(pool.map(lambda job: list(self.iter_pages(job)), jobs))
+        for index, pages in zip(pending, fetched):
+            results[index] = [row for page in pages for row in page]
+            if self.cache is not None:
+                self.cache.put(keys[index], pages, requests[index].tables)
+        return [rows or [] for rows in results]
+
+    def iter_pages(self, job: Any, *, page_size: int | None = None) -> Iterator[list[dict[str, Any]]]:
+        """Yield result rows one page at a time, so only a single page is held in memory."""
+        pages = job.result(page_size=page_size or self.page_size).pages
+        while True:
+            # Only the fetch is timed; the caller's processing between pages is excluded.
+            with phase("bigquery.page"):
+                page = next(pages, None)
+                rows = None if page is None else [dict(row) for row in page]
+            if rows is None:
+                return
+            yield rows
+
+    def iter_dataframes(self, job: Any, *, page_size: int | None = None) -> Iterator[pd.DataFrame]:
+        """Yield results as pandas chunks, via the Storage Read API when it is enabled.
+
+        Cached and stub jobs have no server-side table to read, so they always stream
+        their own pages.
+        """
+        storage = None if isinstance(job, BigQueryStubJob) else self._storage_client()
+        if storage is not None:
+            rows = job.result(page_size=page_size or self.page_size)
+            yield from rows.to_dataframe_iterable(bqstorage_client=storage)
+            return
+        for page in self.iter_pages(job, page_size=page_size):
+            yield pd.DataFrame.from_records(page)
+
+    def iter_arrow_batches(self, job: Any, *, page_size: int | None = None) -> Iterator[Any]:
+        """Yield results as ``pyarrow.RecordBatch`` objects; requires ``pyarrow``."""
+        rows = job.result(page_size=page_size or self.page_size)
+        yield from rows.to_arrow_iterable(bqstorage_client=self._storage_client())
 
     def run_sql(self, sql: str, parameters: Mapping[str, Any] | None = None) -> bigquery.QueryJob:
         job_config = None
@@ -82,11 +315,26 @@ class BigQueryEarthEngineClient:
                 for name, value in parameters.items()
             ]
             job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
-        return client.query(sql, job_config=job_config)
+        with phase("bigquery.query"):
+            return client.query(sql, job_config=job_config)
 
 
+@lru_cache(maxsize=1)
 def get_bigquery_client() -> BigQueryEarthEngineClient:
+    """Process-wide connector so every caller shares one authenticated client."""
     settings = get_settings()
     if not settings.gcp_project or not settings.bigquery_dataset:
         raise RuntimeError("BigQuery client requires GCP_PROJECT and BQ_DATASET to be set.")
-    return BigQueryEarthEngineClient(project=settings.gcp_project, dataset=settings.bigquery_dataset)
+    cache = None
+    if settings.region_stats_cache_path:
+        cache_path = Path(settings.region_stats_cache_path)
+        if not cache_path.is_absolute():
+            cache_path = Path(__file__).resolve().parent.parent / cache_path
+        cache = RegionStatsCache(path=cache_path, ttl_seconds=settings.region_stats_cache_ttl_seconds)
+    return BigQueryEarthEngineClient(
+        project=settings.gcp_project,
+        dataset=settings.bigquery_dataset,
+        cache=cache,
+        page_size=settings.bigquery_page_size,
+        use_storage_api=settings.bigquery_use_storage_api,
+    )
@@ -1,19 +1,193 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 import geojson
+import numpy as np
+import shapely
+from shapely.geometry import mapping, shape
+from shapely.strtree import STRtree
+
+from ..config import get_settings
+from ..utils.telemetry import phase
+
+GEOJSON_SUFFIXES = {".geojson", ".json"}
+
+
+@dataclass(frozen=True)
+class DetailLevel:
+    """Simplification tolerance (degrees) and output coordinate precision (decimals)."""
+
+    name: str
+    tolerance: float
+    precision: int
+    min_zoom: int
+
+
+DETAIL_LEVELS = (
+    DetailLevel("full", 0.0, 6, 10),
+    DetailLevel("high", 0.001, 5, 7),
+    DetailLevel("medium", 0.01, 4, 4),
+    DetailLevel("low", 0.05, 3, 0),
+)
+DETAIL_BY_NAME = {level.name: level for level in DETAIL_LEVELS}
+
+
+def detail_for_zoom(zoom: int | None) -> DetailLevel:
+    """Pick the coarsest level that still looks right at a web-map ``zoom``; ``None`` is full detail."""
+    if zoom is None:
+        return DETAIL_LEVELS[0]
+    return next(level for level in DETAIL_LEVELS if zoom >= level.min_zoom)
+
+
+def _simplify(geometries: np.ndarray, level: DetailLevel) -> np.ndarray:
+    simplified = geometries
+    if level.tolerance:
+        # Simplify the counties as one coverage so shared borders move together; simplifying
+        # each polygon on its own leaves slivers and overlaps between neighbours.
+        simplified = shapely.coverage_simplify(geometries, level.tolerance)
+    quantized = shapely.set_precision(simplified, 10.0 ** -level.precision)
+    # Snapping can collapse slivers entirely; keep the unsnapped shape for those.
+    return np.where(shapely.is_empty(quantized), simplified, quantized)
 
 
 @dataclass
 class BoundaryProvider:
-    """Simple in-memory boundary provider for offline demos."""
-
-    def county_feature(self, county_fips: str) -> dict[str, Any]:
-        # Placeholder geometry (point) for offline usage.
-        feature = geojson.Feature(
-            geometry=geojson.Point((-95.7129, 37.0902)),
-            properties={"county_fips": county_fips, "name": "Synthetic County"},
-        )
-        return feature.__geo_interface__  # type: ignore[attr-defined]
+    """County boundaries backed by a local GeoJSON file (e.g. TIGER counties).
+
+    Geometries are parsed once into shapely objects behind an STRtree for
+    point-in-county and bbox queries. Simplified, coordinate-quantized variants are
+    computed once per :data:`DETAIL_LEVELS` entry, and serialized features are cached
+    per (FIPS, level). Simplification treats the counties as a coverage, so it expects
+    non-overlapping polygons such as TIGER boundaries.
+
+    Without a ``source_path`` the provider falls back to a synthetic point so offline
+    demos keep working.
+    """
+
+    source_path: Path | None = None
+    fips_property: str = "GEOID"
+    name_property: str = "NAMELSAD"
+    _fips: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=str), init=False, repr=False)
+    _names: list[str] = field(default_factory=list, init=False, repr=False)
+    _geometries: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=object), init=False, repr=False)
+    _positions: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _tree: STRtree | None = field(default=None, init=False, repr=False)
+    _levels: dict[str, np.ndarray] = field(default_factory=dict, init=False, repr=False)
+    _feature_cache: dict[tuple[str, str], dict[str, Any]] = field(default_factory=dict, init=False, repr=False)
+    _loaded: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded or self.source_path is None:
+                self._loaded = True
+                return
+            if self.source_path.suffix.lower() not in GEOJSON_SUFFIXES:
+                raise ValueError(
+                    f"Unsupported boundary format {self.source_path.suffix!r}; convert it to GeoJSON "
+                    "(e.g. `ogr2ogr -f GeoJSON counties.geojson tl_us_county.shp`)."
+                )
+            with phase("boundaries.load", source=str(self.source_path)):
+                collection = json.loads(self.source_path.read_text())
+                fips: list[str] = []
+                geometries = []
+                for feature in collection.get("features", []):
+                    properties = feature.get("properties") or {}
+                    if feature.get("geometry") is None or self.fips_property not in properties:
+                        continue
+                    fips.append(str(properties[self.fips_property]).zfill(5))
+                    self._names.append(str(properties.get(self.name_property, "")))
+                    geometries.append(shape(feature["geometry"]))
+                self._fips = np.asarray(fips, dtype=str)
+                self._geometries = np.asarray(geometries, dtype=object)
+                shapely.prepare(self._geometries)
+                self._positions = {code: index for index, code in enumerate(fips)}
+                self._tree = STRtree(self._geometries)
+                self._levels = {level.name: _simplify(self._geometries, level) for level in DETAIL_LEVELS}
+                self._loaded = True
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._fips)
+
+    def geometry(self, county_fips: str) -> shapely.Geometry | None:
+        self._ensure_loaded()
+        position = self._positions.get(county_fips)
+        return None if position is None else self._geometries[position]
+
+    def county_feature(self, county_fips: str, detail: DetailLevel | str = "full") -> dict[str, Any]:
+        """GeoJSON feature for a county; cached dicts are shared, so treat them as read-only."""
+        level = detail if isinstance(detail, DetailLevel) else DETAIL_BY_NAME[detail]
+        cached = self._feature_cache.get((county_fips, level.name))
+        if cached is not None:
+            return cached
+        self._ensure_loaded()
+        position = self._positions.get(county_fips)
+        if position is None:
+            # Placeholder geometry (point) for offline usage.
+            feature = geojson.Feature(
+                geometry=geojson.Point((-95.7129, 37.0902)),
+                properties={"county_fips": county_fips, "name": "Synthetic County"},
+            )
+            serialized = feature.__geo_interface__  # type: ignore[attr-defined]
+        else:
+            serialized = {
+                "type": "Feature",
+                "geometry": mapping(self._levels[level.name][position]),
+                "properties": {"county_fips": county_fips, "name": self._names[position]},
+            }
+        self._feature_cache[(county_fips, level.name)] = serialized
+        return serialized
+
+    def locate(self, lon: float, lat: float) -> str | None:
+        result = self.locate_many([lon], [lat])[0]
+        return result or None
+
+    def locate_many(self, lons: Sequence[float] | np.ndarray, lats: Sequence[float] | np.ndarray) -> np.ndarray:
+        """Resolve points to county FIPS in one bulk STRtree query.
+
+        Returns an array aligned with the inputs; points outside every county map to
+        an empty string. Points on a shared border resolve to the first match.
+        """
+        self._ensure_loaded()
+        with phase("boundaries.locate", points=len(lons)):
+            points = shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+            result = np.full(len(points), "", dtype=self._fips.dtype if len(self._fips) else "<U5")
+            if self._tree is None or not len(points):
+                return result
+            point_index, tree_index = self._tree.query(points, predicate="intersects")
+            first = np.unique(point_index, return_index=True)[1]
+            result[point_index[first]] = self._fips[tree_index[first]]
+            return result
+
+    def counties_in_bbox(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> list[str]:
+        self._ensure_loaded()
+        if self._tree is None:
+            return []
+        hits = self._tree.query(shapely.box(min_lon, min_lat, max_lon, max_lat), predicate="intersects")
+        return sorted(self._fips[hits].tolist())
+
+
+def _boundary_source_path() -> Path | None:
+    configured_value = get_settings().boundary_source_path
+    if not configured_value:
+        return None
+    configured = Path(configured_value)
+    if not configured.is_absolute():
+        configured = Path(__file__).resolve().parent.parent / configured
+    return configured
+
+
+@lru_cache(maxsize=1)
+def get_boundary_provider() -> BoundaryProvider:
+    """Process-wide boundary provider so the index and feature cache are built once."""
+    return BoundaryProvider(source_path=_boundary_source_path())
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime
+from datetime import time as dt_time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+# Pages are written before the header row that makes an entry visible, so a fill that
+# stops part-way leaves an entry that still misses.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS region_stats (
+    key TEXT PRIMARY KEY,
+    tables TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    page_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS region_stats_pages (
+    key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    rows TEXT NOT NULL,
+    PRIMARY KEY (key, page)
+);
+"""
+
+Row = dict[str, Any]
+
+TYPE_TAG = "__bq_type__"
+_DECODERS: dict[str, Callable[[str], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": dt_time.fromisoformat,
+    "decimal": Decimal,
+    "bytes": base64.b64decode,
+}
+
+
+def _encode_value(value: Any) -> dict[str, str]:
+    # datetime is a date subclass, so it must be checked first.
+    if isinstance(value, datetime):
+        return {TYPE_TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {TYPE_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, dt_time):
+        return {TYPE_TAG: "time", "value": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {TYPE_TAG: "decimal", "value": str(value)}
+    if isinstance(value, bytes):
+        return {TYPE_TAG: "bytes", "value": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot cache BigQuery value of type {type(value).__name__}.")
+
+
+def _decode_object(obj: dict[str, Any]) -> Any:
+    tag = obj.get(TYPE_TAG)
+    if tag is None or obj.keys() != {TYPE_TAG, "value"}:
+        return obj
+    return _DECODERS[tag](obj["value"])
+
+
+def encode_rows(rows: list[Row]) -> str:
+    """JSON that tags the BigQuery scalar types JSON lacks (TIMESTAMP, DATE, TIME, NUMERIC, BYTES)."""
+    return json.dumps(rows, default=_encode_value)
+
+
+def decode_rows(payload: str) -> list[Row]:
+    """Inverse of :func:`encode_rows`; tagged values come back as their Python types."""
+    return json.loads(payload, object_hook=_decode_object)
+
+
+def cache_key(sql: str, parameters: Mapping[str, Any] | None, table_versions: Mapping[str, str]) -> str:
+    """Hash of the rendered SQL, its parameters and the versions of every source table."""
+    payload = {
+        "sql": sql,
+        "parameters": dict(sorted((parameters or {}).items())),
+        "tables": dict(sorted(table_versions.items())),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class RegionStatsCache:
+    """SQLite-backed cache of region-stats result rows, stored one result page per row.
+
+    Keys embed source table versions, so a modified boundary or raster table misses
+    naturally; ``invalidate`` and ``ttl_seconds`` cover everything else. Values are
+    serialized with :func:`encode_rows`, so timestamps, dates and numerics keep their
+    types, and hits are read back a page at a time.
+    """
+
+    path: Path
+    ttl_seconds: float = 86_400.0
+
+    def __post_init__(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def iter_pages(self, key: str) -> Iterator[list[Row]] | None:
+        """Lazily yield a fresh entry's pages in order, or return ``None`` on a miss."""
+        # Autocommit mode so the explicit BEGIN pins one snapshot for the header check and
+        # every page read, even if the entry is replaced or invalidated mid-iteration.
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("BEGIN")
+        header = connection.execute("SELECT stored_at FROM region_stats WHERE key = ?", (key,)).fetchone()
+        if header is None or time.time() - header[0] > self.ttl_seconds:
+            connection.close()
+            return None
+
+        def pages() -> Iterator[list[Row]]:
+            with closing(connection):
+                cursor = connection.execute(
+                    "SELECT rows FROM region_stats_pages WHERE key = ? ORDER BY page", (key,)
+                )
+                for (payload,) in cursor:
+                    yield decode_rows(payload)
+
+        return pages()
+
+    def get(self, key: str) -> list[Row] | None:
+        pages = self.iter_pages(key)
+        return None if pages is None else [row for page in pages for row in page]
+
+    def store_pages(self, key: str, pages: Iterable[list[Row]], tables: list[str]) -> Iterator[list[Row]]:
+        """Pass ``pages`` through while writing each one; the entry becomes visible after the last."""
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute("DELETE FROM region_stats WHERE key = ?", (key,))
+                connection.execute("DELETE FROM region_stats_pages WHERE key = ?", (key,))
+            page_count = 0
+            for page in pages:
+                with connection:
+                    connection.execute(
+                        "INSERT INTO region_stats_pages (key, page, rows) VALUES (?, ?, ?)",
+                        (key, page_count, encode_rows(page)),
+                    )
+                page_count += 1
+                yield page
+            with connection:
+                connection.execute(
+                    "INSERT INTO region_stats (key, tables, stored_at, page_count) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(sorted(tables)), time.time(), page_count),
+                )
+
+    def put(self, key: str, pages: Iterable[list[Row]], tables: list[str]) -> None:
+        for _ in self.store_pages(key, pages, tables):
+            pass
+
+    def invalidate(self, *, key: str | None = None, table: str | None = None) -> int:
+        """Drop one entry, every entry reading ``table``, or (with no arguments) everything."""
+        if key is not None:
+            return self._delete("key = ?", (key,))
+        if table is not None:
+            return self._delete("EXISTS (SELECT 1 FROM json_each(tables) WHERE value = ?)", (table,))
+        return self._delete("1", ())
+
+    def purge_expired(self) -> int:
+        return self._delete("stored_at < ?", (time.time() - self.ttl_seconds,))
+
+    def _delete(self, where: str, parameters: tuple[Any, ...]) -> int:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"DELETE FROM region_stats_pages WHERE key IN (SELECT key FROM region_stats WHERE {where})",
+                parameters,
+            )
+            return connection.execute(f"DELETE FROM region_stats WHERE {where}", parameters).rowcount
@@ -1,21 +1,246 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Coroutine, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, TypeVar
 
 import httpx
+from opentelemetry import context as otel_context
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from ..config import get_settings
+from ..utils.telemetry import phase
+
+T = TypeVar("T")
+
+POPULATION_STAT_VAR = "Count_Person"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
 
 
 @dataclass
 class DataCommonsClient:
+    """Data Commons population client with a pooled connection and a two-tier cache.
+
+    Places are fetched in batches through ``POST /stat/set/series`` with at most
+    ``max_concurrency`` batches in flight, retrying throttling and transient failures.
+    Series are cached per place in memory (LRU) and, with ``cache_dir``, on disk.
+    Pass ``transport`` (e.g. ``httpx.MockTransport``) to run against a local server.
+
+    All HTTP work runs on one private, long-lived event loop, so the pooled
+    ``AsyncClient`` is bound to a single loop for its whole life; ``close`` releases it.
+    """
+
     base_url: str = "https://api.datacommons.org"
+    api_key: str | None = None
+    timeout: float = 10.0
+    batch_size: int = 500
+    max_concurrency: int = 4
+    max_attempts: int = 3
+    cache_size: int = 10_000
+    cache_ttl_seconds: float = 7 * 86_400.0
+    cache_dir: Path | None = None
+    transport: httpx.AsyncBaseTransport | None = None
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _memory: OrderedDict[str, tuple[float, dict[str, Any]]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, init=False, repr=False)
 
-    async def fetch_population(self, place_dcid: str) -> dict[str, Any]:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{self.base_url}/stat/series",
-                params={"stat_var": "Count_Person", "place": place_dcid},
+    def __post_init__(self) -> None:
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _http(self) -> httpx.AsyncClient:
+        # Only called on the private loop, which owns the pooled connections.
+        if self._client is None:
+            headers = {"X-API-Key": self.api_key} if self.api_key else None
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers=headers,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
             )
-            response.raise_for_status()
-            payload = response.json()
-            return payload
+        return self._client
+
+    async def fetch_population(self, place_dcid: str) -> dict[str, Any]:
+        """``{"series": {date: value}}`` for one place."""
+        return (await self.fetch_population_many([place_dcid]))[place_dcid]
+
+    async def fetch_population_many(self, place_dcids: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """Population series for every place, fetching only cache misses in batches.
+
+        Awaitable from any event loop; the requests themselves run on the private loop.
+        """
+        return await asyncio.wrap_future(self._submit(self._fetch_population_many(place_dcids)))
+
+    async def _fetch_population_many(self, place_dcids: Sequence[str]) -> dict[str, dict[str, Any]]:
+        places = list(dict.fromkeys(place_dcids))
+        results = {place: series for place in places if (series := self._cached(place)) is not None}
+        missing = [place for place in places if place not in results]
+        if missing:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            batches = [missing[start : start + self.batch_size] for start in range(0, len(missing), self.batch_size)]
+            fetched = await asyncio.gather(*(self._fetch_batch(batch, semaphore) for batch in batches))
+            for batch_result in fetched:
+                for place, series in batch_result.items():
+                    self._store(place, series)
+                    results[place] = series
+        return {place: results[place] for place in places}
+
+    async def _fetch_batch(self, places: list[str], semaphore: asyncio.Semaphore) -> dict[str, dict[str, Any]]:
+        async with semaphore:
+            with phase("datacommons.fetch_batch", places=len(places)):
+                response = await self._post_with_retries(places)
+        data = response.json().get("data") or {}
+        return {
+            place: {"series": ((data.get(place) or {}).get(POPULATION_STAT_VAR) or {}).get("val") or {}}
+            for place in places
+        }
+
+    async def _post_with_retries(self, places: list[str]) -> httpx.Response:
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential(multiplier=0.5, max=8),
+            retry=retry_if_exception(_is_retryable),
+            reraise=True,
+        ):
+            with attempt:
+                response = await self._http().post(
+                    "/stat/set/series",
+                    json={"places": places, "stat_vars": [POPULATION_STAT_VAR]},
+                )
+                response.raise_for_status()
+        return response
+
+    def latest_population(self, place_dcids: Sequence[str]) -> dict[str, float]:
+        """Blocking helper returning the latest population per place; call it off the event loop."""
+        payloads = self._submit(self._fetch_population_many(place_dcids)).result()
+        values = {place: latest_observation(payload) for place, payload in payloads.items()}
+        return {place: value for place, value in values.items() if value is not None}
+
+    def _submit(self, coroutine: Coroutine[Any, Any, T]) -> Future[T]:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=_serve, args=(self._loop,), name="datacommons", daemon=True).start()
+            loop = self._loop
+        wrapped = _with_context(otel_context.get_current(), coroutine)
+        return asyncio.run_coroutine_threadsafe(wrapped, loop)
+
+    def close(self) -> None:
+        """Close the pooled connections and stop the private loop; the client restarts lazily."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _cached(self, place: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(place)
+            if entry is not None and now - entry[0] <= self.cache_ttl_seconds:
+                self._memory.move_to_end(place)
+                return entry[1]
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(place)
+        try:
+            stored_at = path.stat().st_mtime
+            series = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if now - stored_at > self.cache_ttl_seconds:
+            return None
+        self._remember(place, stored_at, series)
+        return series
+
+    def _store(self, place: str, series: dict[str, Any]) -> None:
+        self._remember(place, time.time(), series)
+        if self.cache_dir is not None:
+            path = self._disk_path(place)
+            staging = path.with_suffix(".tmp")
+            staging.write_text(json.dumps(series))
+            staging.replace(path)
+
+    def _remember(self, place: str, stored_at: float, series: dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[place] = (stored_at, series)
+            self._memory.move_to_end(place)
+            while len(self._memory) > self.cache_size:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, place: str) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{place.replace('/', '_')}.json"
+
+
+def _serve(loop: asyncio.AbstractEventLoop) -> None:
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+async def _with_context(parent: otel_context.Context, coroutine: Coroutine[Any, Any, T]) -> T:
+    # Tasks on the private loop start from that thread's context; carry the caller's trace over.
+    token = otel_context.attach(parent)
+    try:
+        return await coroutine
+    finally:
+        otel_context.detach(token)
+
+
+def latest_observation(payload: dict[str, Any]) -> float | None:
+    """Most recent value from a ``/stat/series`` payload (``{"series": {date: value}}``)."""
+    series = payload.get("series") or {}
+    if not series:
+        return None
+    return float(series[max(series)])
+
+
+@lru_cache(maxsize=1)
+def get_datacommons_client() -> DataCommonsClient:
+    """Process-wide client so the connection pool and population cache are shared."""
+    settings = get_settings()
+    cache_dir = None
+    if settings.datacommons_cache_dir:
+        cache_dir = Path(settings.datacommons_cache_dir)
+        if not cache_dir.is_absolute():
+            cache_dir = Path(__file__).resolve().parent.parent / cache_dir
+    return DataCommonsClient(
+        base_url=settings.datacommons_base_url,
+        api_key=settings.datacommons_api_key,
+        max_concurrency=settings.datacommons_max_concurrency,
+        cache_dir=cache_dir,
+    )
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, Protocol
 
 from ..config import get_settings
@@ -68,11 +73,84 @@ class EarthAIRealClient(EarthAIProtocol):
         )
 
 
-def get_earth_ai_client() -> EarthAIProtocol:
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as the plan cache key."""
+    return " ".join(query.split()).casefold()
+
+
+@dataclass
+class CachedEarthAIClient(EarthAIProtocol):
+    """Plan cache in front of an Earth AI client.
+
+    Plans are cached per normalised query for ``ttl_seconds`` (LRU-bounded), and
+    concurrent requests for the same query share one upstream ``plan`` call. A cached
+    plan keeps the wording of the query that produced it. Callers get deep copies, so
+    mutating a returned step never leaks into the cache.
+    """
+
+    client: EarthAIProtocol
+    ttl_seconds: float = 3_600.0
+    max_entries: int = 512
+    upstream_calls: int = field(default=0, init=False)
+    _plans: OrderedDict[str, tuple[float, list[PlannerStep]]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _in_flight: dict[str, Future[list[PlannerStep]]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def plan(self, query: str) -> list[PlannerStep]:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._plans.move_to_end(key)
+                return _copy_steps(entry[1])
+            pending = self._in_flight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._in_flight[key] = Future()
+                self.upstream_calls += 1
+        assert pending is not None
+        if not leader:
+            return _copy_steps(pending.result())
+        try:
+            steps = self.client.plan(query)
+        except BaseException as exc:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            pending.set_exception(exc)
+            raise
+        with self._lock:
+            self._plans[key] = (time.monotonic(), steps)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+            self._in_flight.pop(key, None)
+        pending.set_result(steps)
+        return _copy_steps(steps)
+
+    def run(self, step: PlannerStep) -> dict[str, Any]:
+        return self.client.run(step)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+
+def _copy_steps(steps: list[PlannerStep]) -> list[PlannerStep]:
+    return [step.model_copy(deep=True) for step in steps]
+
+
+@lru_cache(maxsize=1)
+def get_earth_ai_client() -> CachedEarthAIClient:
+    """Process-wide client whose plan cache is shared by every request."""
     settings = get_settings()
-    if settings.earth_ai_enabled:
-        return EarthAIRealClient()
-    return EarthAIStubClient()
+    client: EarthAIProtocol = EarthAIRealClient() if settings.earth_ai_enabled else EarthAIStubClient()
+    return CachedEarthAIClient(
+        client=client,
+        ttl_seconds=settings.earth_ai_plan_cache_ttl_seconds,
+        max_entries=settings.earth_ai_plan_cache_max_entries,
+    )
 
 
 def serialize_plan(steps: list[PlannerStep]) -> str:
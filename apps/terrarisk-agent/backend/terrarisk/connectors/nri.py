@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import pairwise
 from pathlib import Path
-from typing import Iterable
+from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from ..config import get_settings
+from ..utils.telemetry import phase
+
 DEFAULT_COLUMNS = [
     "state",
     "county",
@@ -16,22 +29,398 @@ DEFAULT_COLUMNS = [
     "resilience_index",
 ]
 
+STORE_COLUMNS = [
+    "state",
+    "county",
+    "county_fips",
+    "hazard_type",
+    "eal",
+    "population",
+    "resilience_index",
+]
+
+SNAPSHOT_MANIFEST = "manifest.json"
+SNAPSHOT_FORMAT = "terrarisk-nri-npy/1"
+INDEX_NAMES = [
+    "eal_order",
+    "hazard_rows",
+    "hazard_keys",
+    "hazard_starts",
+    "fips_order",
+    "sorted_fips",
+]
+
+
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def _store_name(column: str) -> str:
+    return "eal" if column == "expected_annual_loss" else column
+
+
+def _normalise_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    if "state" in frame:
+        frame["state"] = frame["state"].astype(str).str.strip().str.upper()
+    if "county_fips" in frame:
+        frame["county_fips"] = frame["county_fips"].astype(str).str.zfill(5)
+    if "hazard_type" in frame:
+        frame["hazard_type"] = frame["hazard_type"].str.lower()
+    return frame.rename(columns={"expected_annual_loss": "eal"})
+
+
+def _normalise_predicates(
+    hazards: Iterable[str] | None,
+    states: Iterable[str] | None,
+    county_fips: Iterable[str] | None,
+) -> dict[str, list[str]]:
+    predicates: dict[str, list[str]] = {}
+    if hazards is not None:
+        predicates["hazard_type"] = [haz.lower() for haz in hazards]
+    if states is not None:
+        predicates["state"] = [state.strip().upper() for state in states]
+    if county_fips is not None:
+        predicates["county_fips"] = [str(fips).zfill(5) for fips in county_fips]
+    return predicates
+
+
+def _predicate_mask(columns: Any, predicates: dict[str, list[str]]) -> np.ndarray:
+    masks = [np.isin(np.asarray(columns[name]), values) for name, values in predicates.items()]
+    return np.logical_and.reduce(masks)
+
+
+def is_snapshot(path: Path | None) -> bool:
+    return path is not None and (path / SNAPSHOT_MANIFEST).is_file()
+
 
 @dataclass
 class NRILoader:
     source_path: Path | None = None
+    _store: NRIStore | None = field(default=None, init=False, repr=False, compare=False)
+
+    def load(
+        self,
+        columns: Iterable[str] | None = None,
+        *,
+        hazards: Iterable[str] | None = None,
+        states: Iterable[str] | None = None,
+        county_fips: Iterable[str] | None = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> pd.DataFrame:
+        """Load NRI rows, pushing hazard/state/FIPS predicates down into the read.
 
-    def load(self, columns: Iterable[str] | None = None) -> pd.DataFrame:
+        With predicates, CSV sources are streamed in ``chunksize`` row chunks and
+        snapshots are masked column-by-column, so only matching rows are materialised.
+        """
         usecols = list(columns) if columns else DEFAULT_COLUMNS
         if not self.source_path:
             # Return empty DataFrame when no source path is provided; offline demos inject fixtures.
-            return pd.DataFrame(columns=usecols)
-        frame = pd.read_csv(self.source_path, usecols=usecols)
-        frame["county_fips"] = frame["county_fips"].astype(str).str.zfill(5)
-        frame["hazard_type"] = frame["hazard_type"].str.lower()
-        frame = frame.rename(columns={"expected_annual_loss": "eal"})
-        return frame
+            return pd.DataFrame(columns=[_store_name(name) for name in usecols])
+        predicates = _normalise_predicates(hazards, states, county_fips)
+        if is_snapshot(self.source_path):
+            arrays = open_snapshot(self.source_path)[0]
+            rows = _predicate_mask(arrays, predicates) if predicates else slice(None)
+            return pd.DataFrame(
+                {_store_name(name): np.asarray(arrays[_store_name(name)][rows]) for name in usecols}
+            )
+        if not predicates:
+            return _normalise_frame(pd.read_csv(self.source_path, usecols=usecols, dtype={"county_fips": str}))
+        readcols = list(dict.fromkeys([*usecols, *predicates]))
+        chunks = [
+            chunk[_predicate_mask(chunk, predicates)][[_store_name(name) for name in usecols]]
+            for chunk in (
+                _normalise_frame(raw)
+                for raw in pd.read_csv(
+                    self.source_path, usecols=readcols, dtype={"county_fips": str}, chunksize=chunksize
+                )
+            )
+        ]
+        if not chunks:
+            return pd.DataFrame(columns=[_store_name(name) for name in usecols])
+        return pd.concat(chunks, ignore_index=True)
+
+    def store(self) -> NRIStore:
+        """Columnar store for this source, built on first use and reused afterwards."""
+        if self._store is None:
+            self._store = NRIStore.from_loader(self)
+        return self._store
 
     def hazards_for_county(self, county_fips: str) -> pd.DataFrame:
-        frame = self.load()
-        return frame[frame["county_fips"] == county_fips]
+        return self.hazards_for_counties([county_fips])
+
+    def hazards_for_counties(self, county_fips: Iterable[str]) -> pd.DataFrame:
+        """Batched county lookup against the cached FIPS-sorted index."""
+        store = self.store()
+        return store.frame(store.rows_for_counties(county_fips))
+
+
+def _empty_column(name: str) -> np.ndarray:
+    if name in {"eal", "resilience_index"}:
+        return np.empty(0, dtype=np.float64)
+    if name == "population":
+        return np.empty(0, dtype=np.int64)
+    return np.empty(0, dtype="<U1")
+
+
+def _group_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    """Offsets where each run of equal keys starts, followed by the total length."""
+    if not len(sorted_keys):
+        return np.zeros(1, dtype=np.int64)
+    boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+    return np.concatenate(([0], boundaries, [len(sorted_keys)])).astype(np.int64)
+
+
+def build_indexes(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Sort-based row indexes over ``columns``.
+
+    ``eal_order`` ranks every row by descending EAL; ``hazard_rows`` holds the same
+    rows grouped by hazard (EAL order kept inside each group), ``hazard_keys`` and
+    ``hazard_starts`` delimit the groups; ``fips_order`` sorts rows by county FIPS and
+    ``sorted_fips`` holds the FIPS codes in that order. Snapshots persist these arrays
+    so processes do not repeat the sorts.
+    """
+    eal_order = np.argsort(-columns["eal"], kind="stable")
+    hazards = columns["hazard_type"][eal_order]
+    by_hazard = np.argsort(hazards, kind="stable")
+    hazard_starts = _group_starts(hazards[by_hazard])
+    fips_order = np.argsort(columns["county_fips"], kind="stable")
+    return {
+        "eal_order": eal_order,
+        "hazard_rows": eal_order[by_hazard],
+        "hazard_keys": hazards[by_hazard][hazard_starts[:-1]],
+        "hazard_starts": hazard_starts,
+        "fips_order": fips_order,
+        "sorted_fips": columns["county_fips"][fips_order],
+    }
+
+
+@dataclass
+class NRIStore:
+    """Columnar, load-once view of NRI metrics with hazard and county indexes.
+
+    Columns are NumPy arrays keyed by ``STORE_COLUMNS``. ``hazard_index`` maps each
+    hazard to its row indices pre-sorted by descending EAL; ``fips_order`` sorts rows by
+    county FIPS so batches of counties resolve with a single ``searchsorted``. Both are
+    views over ``indexes`` (see :func:`build_indexes`), which are computed here unless a
+    snapshot supplies them.
+    """
+
+    columns: dict[str, np.ndarray]
+    version: str = "empty"
+    indexes: dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    eal_order: np.ndarray = field(init=False)
+    hazard_index: dict[str, np.ndarray] = field(init=False)
+    fips_order: np.ndarray = field(init=False)
+    sorted_fips: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        if not set(INDEX_NAMES) <= self.indexes.keys():
+            self.indexes = build_indexes(self.columns)
+        starts = self.indexes["hazard_starts"]
+        self.hazard_index = {
+            str(key): self.indexes["hazard_rows"][start:end]
+            for key, (start, end) in zip(self.indexes["hazard_keys"], pairwise(starts))
+        }
+        self.eal_order = self.indexes["eal_order"]
+        self.fips_order = self.indexes["fips_order"]
+        self.sorted_fips = self.indexes["sorted_fips"]
+
+    def __len__(self) -> int:
+        return len(self.columns["eal"])
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, *, version: str = "inline") -> NRIStore:
+        columns: dict[str, np.ndarray] = {}
+        for name in STORE_COLUMNS:
+            if name not in frame or frame.empty:
+                columns[name] = _empty_column(name)
+            elif name in {"eal", "resilience_index"}:
+                columns[name] = frame[name].to_numpy(dtype=np.float64)
+            elif name == "population":
+                columns[name] = frame[name].to_numpy(dtype=np.int64)
+            else:
+                columns[name] = frame[name].to_numpy(dtype=str)
+        return cls(columns=columns, version=version)
+
+    @classmethod
+    def from_loader(cls, loader: NRILoader) -> NRIStore:
+        snapshot = is_snapshot(loader.source_path)
+        with phase("nri.load", source=str(loader.source_path), snapshot=snapshot):
+            if snapshot:
+                return cls.from_snapshot(loader.source_path)  # type: ignore[arg-type]
+            return cls.from_frame(loader.load(), version=_source_version(loader.source_path))
+
+    @classmethod
+    def from_snapshot(cls, snapshot_dir: Path) -> NRIStore:
+        """Open a compiled snapshot zero-copy; workers share the mapped pages."""
+        arrays, manifest = open_snapshot(snapshot_dir)
+        indexes = _load_arrays(Path(manifest["path"]), manifest.get("indexes", []))
+        return cls(columns=arrays, version=manifest["version"], indexes=indexes)
+
+    def rank(self, hazards: Iterable[str] | None = None, *, limit: int | None = None) -> np.ndarray:
+        """Return row indices for ``hazards`` ordered by descending EAL.
+
+        Each hazard group is already EAL-sorted, so a ``limit`` only merges the head of
+        each group instead of sorting every matching row.
+        """
+        if hazards is None:
+            groups = [self.eal_order]
+        else:
+            groups = [self.hazard_index[haz] for haz in dict.fromkeys(hazards) if haz in self.hazard_index]
+        if limit is not None:
+            groups = [group[:limit] for group in groups]
+        if not groups:
+            return np.empty(0, dtype=np.int64)
+        if len(groups) == 1:
+            return groups[0]
+        rows = np.concatenate(groups)
+        rows = rows[np.argsort(-self.columns["eal"][rows], kind="stable")]
+        return rows if limit is None else rows[:limit]
+
+    def select(
+        self,
+        hazards: Iterable[str] | None = None,
+        *,
+        states: Iterable[str] | None = None,
+        county_fips: Iterable[str] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> np.ndarray:
+        """Rank ``hazards`` by descending EAL, restricted to the given states/counties.
+
+        ``limit``/``offset`` page through the ranking; without geography predicates the
+        limit is pushed into :meth:`rank`.
+        """
+        predicates = _normalise_predicates(None, states, county_fips)
+        if not predicates:
+            rows = self.rank(hazards, limit=None if limit is None else offset + limit)
+        else:
+            rows = self.rank(hazards)
+            if rows.size:
+                columns = {name: self.columns[name][rows] for name in predicates}
+                rows = rows[_predicate_mask(columns, predicates)]
+        end = None if limit is None else offset + limit
+        return rows[offset:end]
+
+    def rows_for_counties(self, county_fips: Iterable[str]) -> np.ndarray:
+        """Return row indices for every county in ``county_fips``, in request order."""
+        codes = np.asarray([str(fips).zfill(5) for fips in county_fips], dtype=str)
+        if not codes.size or not len(self):
+            return np.empty(0, dtype=np.int64)
+        starts = np.searchsorted(self.sorted_fips, codes, side="left")
+        counts = np.searchsorted(self.sorted_fips, codes, side="right") - starts
+        total = int(counts.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.fips_order[np.repeat(starts, counts) + offsets]
+
+    def records(self, rows: np.ndarray) -> list[dict[str, Any]]:
+        values = [self.columns[name][rows].tolist() for name in STORE_COLUMNS]
+        return [dict(zip(STORE_COLUMNS, row)) for row in zip(*values)]
+
+    def frame(self, rows: np.ndarray | None = None) -> pd.DataFrame:
+        if rows is None:
+            return pd.DataFrame({name: self.columns[name] for name in STORE_COLUMNS})
+        return pd.DataFrame({name: self.columns[name][rows] for name in STORE_COLUMNS})
+
+
+def _source_version(source_path: Path | None) -> str:
+    if not source_path:
+        return "empty"
+    stat = source_path.stat()
+    fingerprint = f"{source_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+
+def compile_snapshot(source_path: Path, snapshot_dir: Path) -> Path:
+    """Normalise an NRI CSV once and write its columns and indexes as ``.npy`` files.
+
+    Each compile writes a fresh sibling directory; ``snapshot_dir`` is a symlink to it
+    that is swapped with a single ``os.replace``, so readers see either the old or the
+    new snapshot and never a missing or partial one. The previous directory is removed
+    afterwards; processes that already mapped it keep their pages until they reopen.
+    """
+    with phase("nri.compile", source=str(source_path)):
+        store = NRIStore.from_frame(
+            NRILoader(source_path=source_path).load(), version=_source_version(source_path)
+        )
+        snapshot_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{snapshot_dir.name}-", dir=snapshot_dir.parent))
+        try:
+            for name in STORE_COLUMNS:
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(store.columns[name]))
+            for name in INDEX_NAMES:
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(store.indexes[name]))
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "version": store.version,
+                "rows": len(store),
+                "columns": {name: store.columns[name].dtype.str for name in STORE_COLUMNS},
+                "indexes": INDEX_NAMES,
+                "source": str(source_path),
+            }
+            (staging / SNAPSHOT_MANIFEST).write_text(json.dumps(manifest, indent=2))
+            _swap_symlink(snapshot_dir, staging)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    return snapshot_dir
+
+
+def _swap_symlink(link: Path, target: Path) -> None:
+    previous = link.resolve() if link.is_symlink() else None
+    if link.exists() and previous is None:
+        # A plain directory cannot be replaced atomically; move it aside before linking.
+        retired = link.with_name(f"{target.name}.retired")
+        link.rename(retired)
+        previous = retired
+    pending = link.with_name(f"{target.name}.link")
+    pending.symlink_to(target.name, target_is_directory=True)
+    os.replace(pending, link)
+    if previous is not None and previous != target:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def _load_arrays(directory: Path, names: Iterable[str]) -> dict[str, np.ndarray]:
+    return {
+        name: np.load(directory / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+        for name in names
+    }
+
+
+def open_snapshot(snapshot_dir: Path) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    # Resolve the symlink once so every file comes from the same compiled snapshot.
+    snapshot_dir = snapshot_dir.resolve()
+    manifest = json.loads((snapshot_dir / SNAPSHOT_MANIFEST).read_text())
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported NRI snapshot format: {manifest.get('format')!r}")
+    manifest["path"] = str(snapshot_dir)
+    return _load_arrays(snapshot_dir, STORE_COLUMNS), manifest
+
+
+def _nri_source_path() -> Path:
+    configured = Path(get_settings().nri_source_path)
+    if not configured.is_absolute():
+        configured = Path(__file__).resolve().parent.parent / configured
+    return configured
+
+
+@lru_cache(maxsize=1)
+def get_nri_store() -> NRIStore:
+    """Process-wide NRI store, parsed once and shared across requests."""
+    return NRIStore.from_loader(NRILoader(source_path=_nri_source_path()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile an NRI CSV into a memory-mapped snapshot")
+    parser.add_argument("source", type=Path, help="NRI CSV to normalise")
+    parser.add_argument("snapshot", type=Path, help="Destination snapshot directory")
+    args = parser.parse_args()
+
+    snapshot = compile_snapshot(args.source, args.snapshot)
+    manifest = json.loads((snapshot / SNAPSHOT_MANIFEST).read_text())
+    print(f"Wrote {manifest['rows']} rows to {snapshot} (version {manifest['version']})")
+
+
+if __name__ == "__main__":
+    main()
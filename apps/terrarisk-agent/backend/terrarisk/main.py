@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from typing import Annotated
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Annotated, Any
 
-from fastapi import Depends, FastAPI, Path
+from fastapi import Depends, FastAPI, HTTPException, Path, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from .agents.executor import StepDeniedError
 from .config import Settings, get_settings
+from .connectors.boundaries import get_boundary_provider
+from .connectors.datacommons import get_datacommons_client
+from .connectors.nri import get_nri_store
 from .models.domain import (
     AnalysisMode,
     AnalysisRequest,
@@ -15,11 +22,50 @@ from .models.domain import (
     PortfolioStressResponse,
     ScenarioResponse,
 )
-from .services.analysis import run_analysis
+from .services.analysis import GeographyFilterError, run_analysis
+from .services.cache import ResultCache, get_result_cache, request_fingerprint
+from .services.concurrency import (
+    BoundedExecutor,
+    CapacityExceededError,
+    get_analysis_executor,
+)
+from .services.portfolio import (
+    aggregate_exposure,
+    demo_portfolio,
+    exposure_metrics,
+    geocode_portfolio,
+    read_portfolio,
+)
+from .services.scenarios import ScenarioEngine, get_scenario_engine
+from .services.stress import DEFAULT_RETURN_PERIODS, build_stress_cells, run_stress
+from .utils.policy import policy_fingerprint
+from .utils.provenance import get_credential_validator
+from .utils.telemetry import configure_telemetry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    configure_telemetry()
+    # Fail at startup, not with a 500 per request, when the schema or policy bundle is missing.
+    get_credential_validator()
+    policy_fingerprint()  # loads and compiles the bundle unless POLICY_ENFORCEMENT=off
+    # Parse the NRI data before serving so the first request's fingerprint never blocks the loop.
+    await asyncio.to_thread(get_nri_store)
+    # Warm every hazard scenario so /scenarios stays a memo lookup under dashboard polling.
+    await asyncio.to_thread(get_scenario_engine().precompute)
+    yield
+    if get_analysis_executor.cache_info().currsize:
+        executor = get_analysis_executor()
+        get_analysis_executor.cache_clear()
+        await asyncio.to_thread(executor.shutdown)
+    if get_datacommons_client.cache_info().currsize:
+        await asyncio.to_thread(get_datacommons_client().close)
+
 
 app = FastAPI(
     title="TerraRisk Agent API",
     description="Personal passion R&D copilot for geospatial underwriting and response.",
+    lifespan=lifespan,
 )
 
 
@@ -41,40 +87,148 @@ def healthcheck(settings: Annotated[Settings, Depends(get_app_settings)]) -> dic
     return {"status": "ok", "mode": "cloud" if settings.earth_ai_enabled else "offline"}
 
 
+def _analyze_through_cache(cache: ResultCache, key: str, request: AnalysisRequest) -> AnalysisResponse:
+    cached = cache.get_from_disk(key)
+    if cached is not None:
+        return cached
+    response = run_analysis(request)
+    cache.put(key, response)
+    return response
+
+
+async def _run_bounded_analysis(
+    executor: BoundedExecutor, cache: ResultCache, request: AnalysisRequest
+) -> AnalysisResponse:
+    key = request_fingerprint(request, get_nri_store().version, policy_fingerprint())
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        return await executor.run(_analyze_through_cache, cache, key, request)
+    except CapacityExceededError as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"}) from exc
+    except GeographyFilterError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except StepDeniedError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+
+
 @app.post("/analyze", response_model=AnalysisResponse)
-def analyze(request: AnalysisRequest) -> AnalysisResponse:
-    return run_analysis(request)
+async def analyze(
+    request: AnalysisRequest,
+    executor: Annotated[BoundedExecutor, Depends(get_analysis_executor)],
+    cache: Annotated[ResultCache, Depends(get_result_cache)],
+) -> AnalysisResponse:
+    return await _run_bounded_analysis(executor, cache, request)
 
 
 @app.post("/report", response_model=AnalysisResponse)
-def report(request: AnalysisRequest) -> AnalysisResponse:
-    response = run_analysis(request)
+async def report(
+    request: AnalysisRequest,
+    executor: Annotated[BoundedExecutor, Depends(get_analysis_executor)],
+    cache: Annotated[ResultCache, Depends(get_result_cache)],
+) -> AnalysisResponse:
+    response = await _run_bounded_analysis(executor, cache, request)
     return response
 
 
-@app.get("/scenarios/{hazard}", response_model=ScenarioResponse)
-def scenario(hazard: Annotated[HazardType, Path(..., description="Hazard scenario key")]) -> ScenarioResponse:
-    summary = f"Synthetic {hazard.value} scenario for offline mode."
-    metrics = {"risk_score": 0.7, "exposed_population": 125000}
-    recommended_actions = [
-        "Pre-position mitigation assets",
-        "Coordinate evacuation routes with local agencies",
-        "Verify shelter capacity against population-at-risk",
-    ]
-    artifacts: list[Artifact] = []
-    return ScenarioResponse(
-        scenario=hazard,
-        summary=summary,
-        metrics=metrics,
-        recommended_actions=recommended_actions,
-        artifacts=artifacts,
-    )
+@app.get("/metrics")
+def metrics(
+    executor: Annotated[BoundedExecutor, Depends(get_analysis_executor)],
+    cache: Annotated[ResultCache, Depends(get_result_cache)],
+) -> dict[str, Any]:
+    return {
+        "result_cache": cache.stats(),
+        "analysis_executor": {"in_flight": executor.in_flight, "capacity": executor.capacity},
+        "nri_data_version": get_nri_store().version,
+        "credential_validation": get_credential_validator().stats(),
+    }
 
 
-@app.post("/portfolio/stress", response_model=PortfolioStressResponse)
-def portfolio_stress(portfolio_id: str, mode: AnalysisMode = AnalysisMode.OFFLINE) -> PortfolioStressResponse:
-    summary = f"Stress test for portfolio {portfolio_id} in mode {mode.value}."
-    metrics = {"pml": 0.82, "tail_value_at_risk": 0.21}
+@app.get("/scenarios/{hazard}", response_model=ScenarioResponse)
+def scenario(
+    hazard: Annotated[HazardType, Path(..., description="Hazard scenario key")],
+    engine: Annotated[ScenarioEngine, Depends(get_scenario_engine)],
+    geography: Annotated[
+        list[str] | None, Query(description="County FIPS and/or two-letter state codes")
+    ] = None,
+) -> ScenarioResponse:
+    try:
+        return engine.scenario(hazard, geography)
+    except GeographyFilterError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _portfolio_stress(
+    body: bytes,
+    content_type: str | None,
+    *,
+    simulations: int,
+    seed: int | None,
+    return_periods: list[int],
+    tvar_level: float,
+) -> dict[str, Any]:
+    store = get_nri_store()
+    provider = get_boundary_provider()
+    if body:
+        portfolio = read_portfolio(body, content_type)
+    else:
+        portfolio = demo_portfolio(provider, dict.fromkeys(store.columns["county_fips"].tolist()))
+    located = geocode_portfolio(portfolio, provider)
+    nri = store.frame(store.rows_for_counties(located["county_fips"].unique().tolist()))
+    stress = run_stress(
+        build_stress_cells(located, nri),
+        simulations=simulations,
+        seed=seed,
+        return_periods=return_periods,
+        tvar_level=tvar_level,
+    )
+    return {**exposure_metrics(located, aggregate_exposure(located, store)), **stress}
+
+
+@app.post(
+    "/portfolio/stress",
+    response_model=PortfolioStressResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": False,
+            "description": "Insured locations with latitude, longitude and tiv columns. Omit for the offline demo book.",
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/vnd.apache.parquet": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def portfolio_stress(
+    http_request: Request,
+    portfolio_id: str,
+    executor: Annotated[BoundedExecutor, Depends(get_analysis_executor)],
+    mode: AnalysisMode = AnalysisMode.OFFLINE,
+    simulations: Annotated[int, Query(ge=1, le=5_000_000, description="Simulated event years")] = 10_000,
+    seed: Annotated[int | None, Query(description="Seed for reproducible simulations")] = None,
+    return_periods: Annotated[list[int] | None, Query(description="PML return periods in years")] = None,
+    tvar_level: Annotated[float, Query(gt=0, lt=1, description="Confidence level for TVaR")] = 0.99,
+) -> PortfolioStressResponse:
+    body = await http_request.body()
+    try:
+        metrics = await executor.run(
+            _portfolio_stress,
+            body,
+            http_request.headers.get("content-type"),
+            simulations=simulations,
+            seed=seed,
+            return_periods=return_periods or list(DEFAULT_RETURN_PERIODS),
+            tvar_level=tvar_level,
+        )
+    except CapacityExceededError as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"}) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    summary = (
+        f"Stress test for portfolio {portfolio_id} in mode {mode.value}: "
+        f"{metrics['geocoded_locations']} of {metrics['locations']} locations matched to counties."
+    )
     artifacts: list[Artifact] = []
     return PortfolioStressResponse(
         portfolio_id=portfolio_id,
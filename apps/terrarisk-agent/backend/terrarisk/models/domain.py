@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Sequence
+from typing import Any, Literal, Sequence
 
 from pydantic import BaseModel, Field
 
@@ -19,6 +19,11 @@ class HazardType(str, Enum):
     FLOOD = "flood"
 
 
+class LayerFormat(str, Enum):
+    FEATURE_COLLECTION = "geojson"
+    GEOJSON_SEQ = "geojsonseq"
+
+
 class PlannerStep(BaseModel):
     id: str
     description: str
@@ -31,6 +36,14 @@ class PlannerResult(BaseModel):
     steps: list[PlannerStep]
 
 
+class StepExecution(BaseModel):
+    step_id: str
+    source: str
+    status: Literal["succeeded", "failed", "skipped", "denied"]
+    duration_ms: float | None = None
+    error: str | None = None
+
+
 class Artifact(BaseModel):
     uri: str
     type: str
@@ -50,6 +63,22 @@ class ActionCredential(BaseModel):
     trace: dict[str, Any] | None = None
 
 
+class ManifestLeaf(BaseModel):
+    kind: Literal["artifact", "credential"]
+    ref: str
+    digest: str
+
+
+class RunManifest(BaseModel):
+    """Merkle root over every artifact hash and credential digest produced by a run."""
+
+    run_id: str
+    algorithm: Literal["sha256"] = "sha256"
+    merkle_root: str
+    leaves: list[ManifestLeaf]
+    signatures: list[dict[str, Any]] = Field(default_factory=list)
+
+
 class AnalysisRequest(BaseModel):
     query: str
     geography_filter: list[str] | None = None
@@ -57,6 +86,15 @@ class AnalysisRequest(BaseModel):
     mode: AnalysisMode = AnalysisMode.OFFLINE
     portfolio_reference: str | None = None
     allow_pii: bool = False
+    top_k: int | None = Field(default=None, ge=1, description="Keep only the top-K counties by EAL.")
+    offset: int = Field(default=0, ge=0, description="Skip this many ranked counties (pagination).")
+    layer_format: LayerFormat = LayerFormat.FEATURE_COLLECTION
+    map_zoom: int | None = Field(
+        default=None,
+        ge=0,
+        le=22,
+        description="Target web-map zoom; selects a cached simplification level for map layers.",
+    )
 
 
 class AnalysisResponse(BaseModel):
@@ -64,6 +102,8 @@ class AnalysisResponse(BaseModel):
     steps: list[PlannerStep]
     artifacts: list[Artifact]
     action_credentials: list[ActionCredential]
+    executions: list[StepExecution] = Field(default_factory=list)
+    manifest: RunManifest | None = None
 
 
 class ScenarioResponse(BaseModel):
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from contextlib import ExitStack
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Self
+
+from ..models.domain import Artifact
+from ..utils.telemetry import phase, record_bytes
+
+
+class ArtifactWriter:
+    """File writer that computes SHA-256 and size incrementally as chunks are written.
+
+    Accepts ``str`` or ``bytes`` chunks, so it can back ``csv.writer`` or a streaming
+    serializer directly; the finished :class:`Artifact` never requires reading the
+    file back. Each write is traced as an ``artifact.write`` phase, and its size is
+    recorded in the ``terrarisk.artifact.bytes`` histogram.
+    """
+
+    def __init__(self, path: Path, media_type: str, *, encoding: str = "utf-8") -> None:
+        self.path = path
+        self.media_type = media_type
+        self.encoding = encoding
+        self._digest = hashlib.sha256()
+        self._size = 0
+        self._handle: IO[bytes] | None = None
+        self._telemetry = ExitStack()
+
+    def __enter__(self) -> Self:
+        self._span = self._telemetry.enter_context(
+            phase("artifact.write", media_type=self.media_type, artifact=self.path.name)
+        )
+        self._handle = self.path.open("wb")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+        self._span.set_attribute("size_bytes", self._size)
+        record_bytes(self.media_type, self._size)
+        self._telemetry.__exit__(exc_type, exc, traceback)
+
+    def write(self, data: str | bytes) -> int:
+        if self._handle is None:
+            raise ValueError("ArtifactWriter must be opened with a context manager before writing.")
+        chunk = data.encode(self.encoding) if isinstance(data, str) else data
+        self._handle.write(chunk)
+        self._digest.update(chunk)
+        self._size += len(chunk)
+        return len(data)
+
+    def writelines(self, chunks: Iterable[str | bytes]) -> None:
+        for chunk in chunks:
+            self.write(chunk)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+    def artifact(self, metadata: dict[str, Any] | None = None) -> Artifact:
+        return Artifact(
+            uri=str(self.path),
+            type=self.media_type,
+            hash=self.hexdigest,
+            metadata={"size_bytes": self._size, **(metadata or {})},
+        )
+
+
+def write_artifact(path: Path, media_type: str, chunks: Iterable[str | bytes]) -> Artifact:
+    with ArtifactWriter(path, media_type) as writer:
+        writer.writelines(chunks)
+    return writer.artifact()
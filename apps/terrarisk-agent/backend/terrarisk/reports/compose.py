@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import csv
-import hashlib
-import json
 from pathlib import Path
 from typing import Any, Iterable, Tuple
 
 from jinja2 import Template
 
 from ..config import get_settings
-from ..models.domain import AnalysisRequest, Artifact
+from ..models.domain import AnalysisRequest, Artifact, LayerFormat
 from ..utils.provenance import create_action_credential
+from ..utils.telemetry import phase
+from .artifacts import ArtifactWriter, write_artifact
+from .geojson import iter_feature_collection, iter_geojson_seq
 
 
 REPORT_TEMPLATE = Template(
@@ -47,10 +48,6 @@ REPORT_TEMPLATE = Template(
 )
 
 
-def _hash_bytes(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
-
-
 def _artifact_dir() -> Path:
     settings = get_settings()
     configured = Path(settings.artifact_dir)
@@ -61,32 +58,37 @@ def _artifact_dir() -> Path:
     return configured
 
 
-def _write_pdf(run_id: str, html: str) -> Path:
+def _write_pdf(run_id: str, html: str) -> Artifact:
     pdf_path = _artifact_dir() / f"{run_id}_report.pdf"
     # Using simple write for placeholder, real implementation should render with WeasyPrint.
-    pdf_path.write_text("PDF placeholder for offline mode.\n\n" + html)
-    return pdf_path
+    return write_artifact(pdf_path, "application/pdf", ["PDF placeholder for offline mode.\n\n", html])
 
 
-def _write_geojson(run_id: str, features: Iterable[dict[str, Any]]) -> Path:
+def _write_geojson(
+    run_id: str,
+    features: Iterable[dict[str, Any]],
+    layer_format: LayerFormat = LayerFormat.FEATURE_COLLECTION,
+) -> Artifact:
+    if layer_format is LayerFormat.GEOJSON_SEQ:
+        seq_path = _artifact_dir() / f"{run_id}_layers.geojsons"
+        return write_artifact(seq_path, "application/geo+json-seq", iter_geojson_seq(features))
     geojson_path = _artifact_dir() / f"{run_id}_layers.geojson"
-    content = {"type": "FeatureCollection", "features": list(features)}
-    geojson_path.write_text(json.dumps(content))
-    return geojson_path
+    return write_artifact(geojson_path, "application/geo+json", iter_feature_collection(features))
 
 
-def _write_csv(run_id: str, rows: Iterable[dict[str, Any]]) -> Path:
+def _write_csv(run_id: str, rows: Iterable[dict[str, Any]]) -> Artifact:
     csv_path = _artifact_dir() / f"{run_id}_portfolio_diff.csv"
-    rows = list(rows)
-    if not rows:
-        csv_path.write_text("portfolio_id,metric,value\n")
-        return csv_path
-    with csv_path.open("w", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=rows[0].keys())
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    return csv_path
+    iterator = iter(rows)
+    first = next(iterator, None)
+    with ArtifactWriter(csv_path, "text/csv") as handle:
+        if first is None:
+            handle.write("portfolio_id,metric,value\n")
+        else:
+            writer = csv.DictWriter(handle, fieldnames=first.keys())
+            writer.writeheader()
+            writer.writerow(first)
+            writer.writerows(iterator)
+    return handle.artifact()
 
 
 def build_report_bundle(
@@ -98,20 +100,17 @@ def build_report_bundle(
     features: Iterable[dict[str, Any]],
     portfolio_rows: Iterable[dict[str, Any]],
 ) -> Tuple[list[Artifact], list]:
-    html = REPORT_TEMPLATE.render(
-        query=request.query,
-        mode=request.mode.value,
-        highlights=highlights,
-        sources=sources,
-    )
-    pdf_path = _write_pdf(run_id, html)
-    geojson_path = _write_geojson(run_id, features)
-    csv_path = _write_csv(run_id, portfolio_rows)
-
+    with phase("report.render"):
+        html = REPORT_TEMPLATE.render(
+            query=request.query,
+            mode=request.mode.value,
+            highlights=highlights,
+            sources=sources,
+        )
     artifacts = [
-        Artifact(uri=str(pdf_path), type="application/pdf", hash=_hash_bytes(pdf_path.read_bytes())),
-        Artifact(uri=str(geojson_path), type="application/geo+json", hash=_hash_bytes(geojson_path.read_bytes())),
-        Artifact(uri=str(csv_path), type="text/csv", hash=_hash_bytes(csv_path.read_bytes())),
+        _write_pdf(run_id, html),
+        _write_geojson(run_id, features, request.layer_format),
+        _write_csv(run_id, portfolio_rows),
     ]
 
     credential = create_action_credential(
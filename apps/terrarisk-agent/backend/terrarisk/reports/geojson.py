@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+# RFC 8142 record separator that prefixes every text in a GeoJSON text sequence.
+RECORD_SEPARATOR = "\x1e"
+
+
+def _dumps(feature: dict[str, Any]) -> str:
+    return json.dumps(feature, separators=(",", ":"))
+
+
+def iter_feature_collection(features: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Serialize a FeatureCollection one feature at a time.
+
+    Only the current feature is ever held as a string, so ``features`` can be a
+    generator over nationwide layers without materialising the whole collection.
+    """
+    yield '{"type":"FeatureCollection","features":['
+    for index, feature in enumerate(features):
+        yield ("," if index else "") + _dumps(feature)
+    yield "]}"
+
+
+def iter_geojson_seq(features: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Serialize features as newline-delimited GeoJSON text sequence records (RFC 8142)."""
+    for feature in features:
+        yield f"{RECORD_SEPARATOR}{_dumps(feature)}\n"
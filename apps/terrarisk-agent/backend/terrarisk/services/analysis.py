@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import uuid
-from pathlib import Path
+from collections.abc import Iterable, Mapping
 from typing import Any
 
+import pandas as pd
+import structlog
+
+from ..agents.executor import StepDeniedError, StepGuard, StepHandler, execute_plan
 from ..agents.planner import build_planner_steps
-from ..connectors.boundaries import BoundaryProvider
-from ..connectors.nri import NRILoader
+from ..config import get_settings
+from ..connectors.bigquery_ee import get_bigquery_client
+from ..connectors.boundaries import detail_for_zoom, get_boundary_provider
+from ..connectors.earth_ai import get_earth_ai_client
+from ..connectors.nri import get_nri_store
 from ..models.domain import (
     ActionCredential,
+    AnalysisMode,
     AnalysisRequest,
     AnalysisResponse,
     Artifact,
@@ -16,74 +24,170 @@ from ..models.domain import (
     PlannerStep,
 )
 from ..reports.compose import build_report_bundle
-from ..utils.provenance import create_action_credential
+from ..utils.policy import PolicyRequest, get_policy_engine
+from ..utils.provenance import (
+    CredentialSpec,
+    build_action_credentials,
+    build_run_manifest,
+    get_credential_validator,
+)
+from ..utils.signing import get_signing_pipeline
+from ..utils.telemetry import phase
+
+logger = structlog.get_logger(__name__)
+
+# Policy action per planner step source. The Earth AI stub makes no external call, so it
+# has no governed action; unknown sources are sent as-is and fall to the bundle's default.
+STEP_ACTIONS: dict[str, str | None] = {
+    "earth_ai": "earth_ai.run",
+    "earth_ai_stub": None,
+    "nri_loader": "nri.load",
+    "bigquery_ee": "bigquery.region_stats",
+    "report_compose": "analysis.generate_report",
+}
+
+# USPS codes for the states, DC and the territories covered by the National Risk Index.
+US_STATE_CODES = frozenset(
+    {
+        "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL",
+        "IN", "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE",
+        "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD",
+        "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY", "AS", "GU", "MP", "PR", "VI",
+    }
+)
+
 
+class GeographyFilterError(ValueError):
+    """A geography filter entry is neither a known state code nor a county FIPS code."""
 
-def _load_nri_samples() -> list[dict[str, Any]]:
-    data_path = Path(__file__).resolve().parent.parent / "examples" / "offline_nri.csv"
-    loader = NRILoader(source_path=data_path)
-    frame = loader.load()
-    if frame.empty:
-        return []
-    return frame.to_dict(orient="records")
+
+def split_geography_filter(
+    geography_filter: list[str] | None,
+) -> tuple[list[str] | None, list[str] | None]:
+    """Split a geography filter into two-letter state codes and 5-digit county FIPS codes.
+
+    Entries are trimmed and upper-cased the same way the NRI ``state`` column is.
+    Anything else raises :class:`GeographyFilterError` instead of silently matching
+    no rows.
+    """
+    if not geography_filter:
+        return None, None
+    states: list[str] = []
+    county_fips: list[str] = []
+    invalid: list[str] = []
+    for item in geography_filter:
+        code = item.strip().upper()
+        if code in US_STATE_CODES:
+            states.append(code)
+        elif len(code) == 5 and code.isascii() and code.isdigit():
+            county_fips.append(code)
+        else:
+            invalid.append(item)
+    if invalid:
+        raise GeographyFilterError(
+            f"Unknown geography filter entries {invalid}; use two-letter state codes or 5-digit county FIPS codes."
+        )
+    return states or None, county_fips or None
 
 
 def _steps_to_credentials(steps: list[PlannerStep]) -> list[ActionCredential]:
-    credentials: list[ActionCredential] = []
-    for step in steps:
-        artifacts: list[Artifact] = []
-        credential = create_action_credential(
+    return build_action_credentials(
+        CredentialSpec(
             action_type=f"planner.step.{step.source}",
             inputs=step.inputs,
             outputs=[step.id],
             source=step.source,
-            artifacts=artifacts,
             claims=[{"name": "description", "value": step.description}],
-            mode=None,
         )
-        credentials.append(credential)
-    return credentials
+        for step in steps
+    )
 
 
-def run_analysis(request: AnalysisRequest) -> AnalysisResponse:
-    run_id = str(uuid.uuid4())
+def _load_ranked(request: AnalysisRequest) -> pd.DataFrame:
+    store = get_nri_store()
 
-    planner_result = build_planner_steps(request)
-    planner_credentials = _steps_to_credentials(planner_result.steps)
+    selected_hazards = [haz.value for haz in request.hazards or [HazardType.HURRICANE]]
+    states, county_fips = split_geography_filter(request.geography_filter)
+    with phase("nri.rank", hazards=selected_hazards, data_version=store.version) as span:
+        ranked = store.frame(
+            store.select(
+                selected_hazards,
+                states=states,
+                county_fips=county_fips,
+                limit=request.top_k,
+                offset=request.offset,
+            )
+        )
+        span.set_attribute("rows", len(ranked))
+    return ranked
 
-    nri_records = _load_nri_samples()
 
-    selected_hazards = [haz.value for haz in request.hazards or [HazardType.HURRICANE]]
-    ranked = [
-        record
-        for record in nri_records
-        if record["hazard_type"] in selected_hazards
+def join_region_stats(
+    ranked: pd.DataFrame,
+    batches: Iterable[pd.DataFrame],
+    *,
+    stat_name: str = "mean",
+    key: str = "boundary_id",
+) -> pd.DataFrame:
+    """Left-join streamed region-stats batches onto the ranked counties.
+
+    Each batch is trimmed to the ranked FIPS before the next one is fetched, so memory
+    stays proportional to the result set rather than to the full raster aggregation.
+    """
+    wanted = set(ranked["county_fips"])
+    matched = [
+        batch.loc[batch[key].astype(str).isin(wanted), [key, stat_name]]
+        for batch in batches
+        if not batch.empty
     ]
-    ranked.sort(key=lambda item: item["eal"], reverse=True)
+    column = f"region_{stat_name}"
+    if not matched:
+        return ranked.assign(**{column: float("nan")})
+    stats = (
+        pd.concat(matched, ignore_index=True)
+        .astype({key: str})
+        .drop_duplicates(key)
+        .rename(columns={key: "county_fips", stat_name: column})
+    )
+    return ranked.merge(stats, on="county_fips", how="left")
 
-    boundary_provider = BoundaryProvider()
-    features = [boundary_provider.county_feature(item["county_fips"]) for item in ranked]
 
-    highlights = [
-        f"{item['county']} ({item['county_fips']}): EAL {item['eal']} with resilience index {item['resilience_index']}"
-        for item in ranked
-    ]
+def _compose_report(
+    request: AnalysisRequest, run_id: str, ranked: pd.DataFrame
+) -> tuple[list[Artifact], list[ActionCredential]]:
+    detail = detail_for_zoom(request.map_zoom)
+    # Features are cached per county and level, so collecting them up front holds only
+    # references while letting the span cover the boundary lookups themselves.
+    with phase("boundaries.features", counties=len(ranked), detail=detail.name):
+        boundary_provider = get_boundary_provider()
+        features = [boundary_provider.county_feature(fips, detail) for fips in ranked["county_fips"].tolist()]
+
+    summary = (
+        ranked["county"]
+        + " ("
+        + ranked["county_fips"]
+        + "): EAL "
+        + ranked["eal"].astype(str)
+        + " with resilience index "
+        + ranked["resilience_index"].astype(str)
+    )
+    for column in (name for name in ranked.columns if name.startswith("region_")):
+        summary = summary + ", raster " + column.removeprefix("region_") + " " + ranked[column].astype(str)
+    highlights = summary.tolist()
     sources = [
         "Synthetic Earth AI reasoning trace",
         "FEMA National Risk Index (offline fixture)",
         "BigQuery Earth Engine (template placeholders)",
     ]
-    portfolio_rows = [
-        {
-            "portfolio_id": request.portfolio_reference or "demo-portfolio",
-            "county_fips": item["county_fips"],
-            "hazard": item["hazard_type"],
-            "eal": item["eal"],
-        }
-        for item in ranked
-    ]
+    portfolio_rows = (
+        ranked[["county_fips", "hazard_type", "eal"]]
+        .rename(columns={"hazard_type": "hazard"})
+        .assign(portfolio_id=request.portfolio_reference or "demo-portfolio")
+        [["portfolio_id", "county_fips", "hazard", "eal"]]
+        .to_dict(orient="records")
+    )
 
-    artifacts, report_credentials = build_report_bundle(
+    return build_report_bundle(
         request,
         run_id=run_id,
         highlights=highlights,
@@ -92,9 +196,136 @@ def run_analysis(request: AnalysisRequest) -> AnalysisResponse:
         portfolio_rows=portfolio_rows,
     )
 
+
+def _bigquery_skip_reason(request: AnalysisRequest) -> str | None:
+    if request.mode is AnalysisMode.OFFLINE:
+        return "BigQuery Earth Engine templates are placeholders offline."
+    settings = get_settings()
+    if not settings.gcp_project or not settings.bigquery_dataset:
+        return "GCP_PROJECT and BQ_DATASET are not set."
+    return None
+
+
+def _step_handlers(
+    request: AnalysisRequest, run_id: str, steps: list[PlannerStep]
+) -> dict[str, StepHandler]:
+    earth_ai = get_earth_ai_client()
+    sources = {step.id: step.source for step in steps}
+
+    def run_earth_ai(step: PlannerStep, upstream: Mapping[str, Any]) -> dict[str, Any]:
+        return earth_ai.run(step)
+
+    def load_nri(step: PlannerStep, upstream: Mapping[str, Any]) -> pd.DataFrame:
+        return _load_ranked(request)
+
+    def join_bigquery(step: PlannerStep, upstream: Mapping[str, Any]) -> dict[str, Any]:
+        skipped = _bigquery_skip_reason(request)
+        if skipped is not None:
+            return {"status": "skipped", "reason": skipped}
+        settings = get_settings()
+        client = get_bigquery_client()
+        if not settings.region_stats_boundary_table or not settings.region_stats_raster_table:
+            return {"status": "configured", "project": client.project, "dataset": client.dataset}
+        # With a region-stats cache this goes through the cached batch path; otherwise it
+        # is a live job. Either way the compose step streams its pages into the join.
+        job = client.run_region_stats(
+            boundary_table=settings.region_stats_boundary_table,
+            boundary_key=settings.region_stats_boundary_key,
+            raster_table=settings.region_stats_raster_table,
+        )
+        return {"status": "submitted", "job": job, "stat_name": "mean"}
+
+    def compose(step: PlannerStep, upstream: Mapping[str, Any]) -> tuple[list[Artifact], list[ActionCredential]]:
+        ranked = next(output for dep, output in upstream.items() if sources[dep] == "nri_loader")
+        region_stats: dict[str, Any] = next(
+            (output for dep, output in upstream.items() if sources[dep] == "bigquery_ee"), {}
+        )
+        if region_stats.get("job") is not None:
+            ranked = join_region_stats(
+                ranked,
+                get_bigquery_client().iter_dataframes(region_stats["job"]),
+                stat_name=region_stats["stat_name"],
+            )
+        return _compose_report(request, run_id, ranked)
+
+    return {
+        "earth_ai": run_earth_ai,
+        "earth_ai_stub": run_earth_ai,
+        "nri_loader": load_nri,
+        "bigquery_ee": join_bigquery,
+        "report_compose": compose,
+    }
+
+
+def _policy_guard(request: AnalysisRequest) -> StepGuard | None:
+    engine = get_policy_engine()
+    if engine is None:
+        return None
+    settings = get_settings()
+    flags = frozenset(
+        flag
+        for flag, enabled in (("earth_ai_enabled", settings.earth_ai_enabled), ("pii_unlocked", request.allow_pii))
+        if enabled
+    )
+
+    def guard(step: PlannerStep) -> str | None:
+        action = STEP_ACTIONS.get(step.source, step.source)
+        # Only governed calls a step will really make are checked: the Earth AI stub and
+        # a BigQuery step that skips itself never leave the process.
+        if action is None or (step.source == "bigquery_ee" and _bigquery_skip_reason(request) is not None):
+            return None
+        decision = engine.decide(
+            PolicyRequest(
+                action=action,
+                mode=request.mode.value,
+                role=settings.policy_actor_role,
+                flags=flags,
+                geo_precision="county",
+            )
+        )
+        if decision.allowed:
+            return None
+        reason = "; ".join(decision.reasons)
+        if settings.policy_enforcement == "warn":
+            logger.warning("policy_denied_step", step=step.id, action=action, mode=request.mode.value, reason=reason)
+            return None
+        return reason
+
+    return guard
+
+
+def run_analysis(request: AnalysisRequest) -> AnalysisResponse:
+    run_id = str(uuid.uuid4())
+    with phase("analysis.run", run_id=run_id, mode=request.mode.value):
+        return _run_analysis(request, run_id)
+
+
+def _run_analysis(request: AnalysisRequest, run_id: str) -> AnalysisResponse:
+    planner_result = build_planner_steps(request)
+    planner_credentials = _steps_to_credentials(planner_result.steps)
+
+    plan_run = execute_plan(
+        planner_result.steps,
+        _step_handlers(request, run_id, planner_result.steps),
+        guard=_policy_guard(request),
+    )
+    denied = next((error for error in plan_run.errors.values() if isinstance(error, StepDeniedError)), None)
+    if denied is not None:
+        raise denied
+    report_step = next(step for step in planner_result.steps if step.source == "report_compose")
+    artifacts, report_credentials = plan_run.output(report_step.id)
+    credentials = [*planner_credentials, *report_credentials]
+    manifest = build_run_manifest(run_id, artifacts, credentials)
+    signing = get_signing_pipeline()
+    if signing is not None:
+        manifest, credentials = signing.sign_run(manifest, credentials)
+    get_credential_validator().check(credentials)
+
     return AnalysisResponse(
         run_id=run_id,
         steps=planner_result.steps,
         artifacts=artifacts,
-        action_credentials=[*planner_credentials, *report_credentials],
+        action_credentials=credentials,
+        executions=plan_run.executions,
+        manifest=manifest,
     )
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from ..config import get_settings
+from ..models.domain import AnalysisRequest, AnalysisResponse
+
+
+def request_fingerprint(request: AnalysisRequest, data_version: str, policy_version: str = "off") -> str:
+    """Content hash of an analysis request plus the NRI data and policy it ran against.
+
+    Hazards and geographies are order-insensitive for the analysis, so they are
+    sorted before hashing to let equivalent dashboard requests share an entry.
+    ``policy_version`` (see ``policy_fingerprint``) keeps a response cached under one
+    bundle, role or enforcement mode from being served once the policy changes.
+    """
+    payload = request.model_dump(mode="json")
+    payload["hazards"] = sorted(payload["hazards"]) if payload["hazards"] else None
+    payload["geography_filter"] = sorted(payload["geography_filter"]) if payload["geography_filter"] else None
+    payload["data_version"] = data_version
+    payload["policy_version"] = policy_version
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass
+class ResultCache:
+    """LRU + TTL cache of analysis responses with an optional on-disk tier.
+
+    Entries whose artifacts no longer exist on disk are treated as misses, since the
+    cached response would otherwise point at files that were cleaned up.
+    """
+
+    max_entries: int = 256
+    ttl_seconds: float = 900.0
+    disk_dir: Path | None = None
+    hits: int = field(default=0, init=False)
+    disk_hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    _entries: OrderedDict[str, tuple[float, AnalysisResponse]] = field(default_factory=OrderedDict, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> AnalysisResponse | None:
+        """Memory-tier lookup; cheap enough to call on the event loop."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, response = entry
+                if self._is_fresh(stored_at) and _artifacts_exist(response):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            if self.disk_dir is None:
+                self.misses += 1
+            return None
+
+    def get_from_disk(self, key: str) -> AnalysisResponse | None:
+        """Disk-tier lookup, promoting hits into memory. Run it off the event loop."""
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            response = AnalysisResponse.model_validate_json(path.read_bytes())
+        except (OSError, ValueError):
+            response = None
+        if response is None or not self._is_fresh(stored_at) or not _artifacts_exist(response):
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._store(key, stored_at, response)
+        return response
+
+    def put(self, key: str, response: AnalysisResponse) -> None:
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, stored_at, response)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            staging = path.with_suffix(".tmp")
+            staging.write_text(response.model_dump_json())
+            staging.replace(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_enabled": self.disk_dir is not None,
+            }
+
+    def _store(self, key: str, stored_at: float, response: AnalysisResponse) -> None:
+        self._entries[key] = (stored_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at <= self.ttl_seconds
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.json"
+
+
+def _artifacts_exist(response: AnalysisResponse) -> bool:
+    return all(Path(artifact.uri).exists() for artifact in response.artifacts)
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache:
+    settings = get_settings()
+    disk_dir = None
+    if settings.result_cache_dir:
+        disk_dir = Path(settings.result_cache_dir)
+        if not disk_dir.is_absolute():
+            disk_dir = Path(__file__).resolve().parent.parent / disk_dir
+    return ResultCache(
+        max_entries=settings.result_cache_max_entries,
+        ttl_seconds=settings.result_cache_ttl_seconds,
+        disk_dir=disk_dir,
+    )
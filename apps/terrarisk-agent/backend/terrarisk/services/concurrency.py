@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from ..config import get_settings
+
+T = TypeVar("T")
+
+
+class CapacityExceededError(RuntimeError):
+    """Raised when the executor already holds ``max_workers + max_queue`` jobs."""
+
+
+@dataclass
+class BoundedExecutor:
+    """Thread pool for CPU/file-heavy request stages with admission control.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more wait for a
+    worker; anything beyond that is rejected immediately so callers can shed load.
+    """
+
+    max_workers: int = 4
+    max_queue: int = 16
+    _pool: ThreadPoolExecutor = field(init=False, repr=False)
+    _in_flight: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.max_workers < 1 or self.max_queue < 0:
+            raise ValueError("max_workers must be >= 1 and max_queue must be >= 0.")
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="terrarisk-worker")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise CapacityExceededError(
+                    f"{self._in_flight} jobs in flight; limit is {self.max_workers} running + {self.max_queue} queued."
+                )
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(func, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the job itself finishes: cancelling the awaiting request
+        # does not stop a job that a worker already started.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _: Future[Any] | None = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+@lru_cache(maxsize=1)
+def get_analysis_executor() -> BoundedExecutor:
+    settings = get_settings()
+    return BoundedExecutor(
+        max_workers=settings.analysis_max_workers,
+        max_queue=settings.analysis_max_queue,
+    )
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..connectors.boundaries import BoundaryProvider
+from ..connectors.nri import NRIStore
+
+PARQUET_MAGIC = b"PAR1"
+COLUMN_ALIASES = {
+    "lat": "latitude",
+    "lon": "longitude",
+    "lng": "longitude",
+    "long": "longitude",
+    "total_insured_value": "tiv",
+}
+REQUIRED_COLUMNS = ("latitude", "longitude", "tiv")
+
+
+def read_portfolio(data: bytes, content_type: str | None = None) -> pd.DataFrame:
+    """Parse an uploaded portfolio of insured locations (CSV or Parquet).
+
+    Parquet is detected from its magic bytes or content type, so clients can post
+    either as ``application/octet-stream``. Columns are matched case-insensitively and
+    ``lat``/``lon`` style aliases are accepted.
+    """
+    if not data:
+        raise ValueError("Portfolio upload is empty.")
+    is_parquet = data[:4] == PARQUET_MAGIC or "parquet" in (content_type or "")
+    try:
+        if is_parquet:
+            frame = pd.read_parquet(io.BytesIO(data))
+        else:
+            frame = pd.read_csv(io.BytesIO(data))
+    except ImportError as exc:
+        raise ValueError(
+            "Parquet portfolios require pyarrow (install the 'portfolio' extra); upload CSV instead."
+        ) from exc
+    frame = frame.rename(columns=lambda name: COLUMN_ALIASES.get(str(name).strip().lower(), str(name).strip().lower()))
+    missing = [name for name in REQUIRED_COLUMNS if name not in frame]
+    if missing:
+        raise ValueError(f"Portfolio is missing required columns: {', '.join(missing)}.")
+    for name in REQUIRED_COLUMNS:
+        frame[name] = pd.to_numeric(frame[name], errors="coerce")
+    if frame[list(REQUIRED_COLUMNS)].isna().any(axis=None):
+        raise ValueError("Portfolio latitude, longitude and tiv must be numeric for every location.")
+    return frame
+
+
+def demo_portfolio(provider: BoundaryProvider, county_fips: Iterable[str], tiv: float = 1_000_000.0) -> pd.DataFrame:
+    """One location per county at a representative interior point, for offline demos."""
+    geometries = [provider.geometry(fips) for fips in county_fips]
+    points = shapely.point_on_surface([geometry for geometry in geometries if geometry is not None])
+    return pd.DataFrame(
+        {
+            "longitude": shapely.get_x(points),
+            "latitude": shapely.get_y(points),
+            "tiv": np.full(len(points), tiv),
+        }
+    )
+
+
+def geocode_portfolio(frame: pd.DataFrame, provider: BoundaryProvider) -> pd.DataFrame:
+    """Attach ``county_fips`` to every location with one bulk point-in-polygon join."""
+    located = frame.copy()
+    located["county_fips"] = provider.locate_many(
+        located["longitude"].to_numpy(dtype=float), located["latitude"].to_numpy(dtype=float)
+    )
+    return located
+
+
+def aggregate_exposure(
+    located: pd.DataFrame, store: NRIStore, hazards: Iterable[str] | None = None
+) -> pd.DataFrame:
+    """Join county exposure to NRI EAL and aggregate per hazard.
+
+    NRI ``eal`` is treated as an annual loss ratio on insured value, so each
+    county-hazard contributes ``tiv * eal`` to the hazard's expected annual loss.
+    """
+    matched = located[located["county_fips"] != ""]
+    by_county = (
+        matched.groupby("county_fips", sort=False)["tiv"]
+        .agg(tiv="sum", locations="size")
+        .reset_index()
+    )
+    nri = store.frame(store.rows_for_counties(by_county["county_fips"].tolist()))
+    if hazards is not None:
+        nri = nri[nri["hazard_type"].isin(list(hazards))]
+    joined = nri[["county_fips", "hazard_type", "eal"]].merge(by_county, on="county_fips", how="inner")
+    joined["expected_annual_loss"] = joined["tiv"] * joined["eal"]
+    return (
+        joined.groupby("hazard_type", sort=True)
+        .agg(
+            exposed_tiv=("tiv", "sum"),
+            locations=("locations", "sum"),
+            counties=("county_fips", "nunique"),
+            expected_annual_loss=("expected_annual_loss", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def exposure_metrics(located: pd.DataFrame, exposure: pd.DataFrame) -> dict[str, Any]:
+    unmatched = located["county_fips"] == ""
+    return {
+        "locations": len(located),
+        "geocoded_locations": int((~unmatched).sum()),
+        "unmatched_locations": int(unmatched.sum()),
+        "total_tiv": float(located["tiv"].sum()),
+        "hazards": {
+            row.hazard_type: {
+                "exposed_tiv": float(row.exposed_tiv),
+                "locations": int(row.locations),
+                "counties": int(row.counties),
+                "expected_annual_loss": float(row.expected_annual_loss),
+            }
+            for row in exposure.itertuples(index=False)
+        },
+    }
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from ..config import get_settings
+from ..connectors.datacommons import get_datacommons_client
+from ..connectors.nri import NRIStore, get_nri_store
+from ..models.domain import HazardType, ScenarioResponse
+from .analysis import split_geography_filter
+
+PopulationFetcher = Callable[[Sequence[str]], Mapping[str, float]]
+
+BASE_ACTIONS = [
+    "Pre-position mitigation assets",
+    "Coordinate evacuation routes with local agencies",
+    "Verify shelter capacity against population-at-risk",
+]
+
+
+def datacommons_population(county_fips: Sequence[str]) -> dict[str, float]:
+    """Latest Data Commons ``Count_Person`` per county; call it off the event loop."""
+    populations = get_datacommons_client().latest_population([f"geoId/{fips}" for fips in county_fips])
+    return {dcid.removeprefix("geoId/"): value for dcid, value in populations.items()}
+
+
+@dataclass
+class ScenarioEngine:
+    """Scenario metrics computed from the NRI store, memoized per (hazard, geography, data version).
+
+    Geographies are canonicalised (trimmed, lower-cased, sorted, de-duplicated) before
+    keying, and the memo is LRU-bounded so arbitrary dashboard filters cannot grow it
+    without limit. Population from ``population_fetcher`` is only fetched when a scenario
+    is requested; :meth:`precompute` warms NRI-only entries.
+    """
+
+    store: NRIStore
+    population_fetcher: PopulationFetcher | None = None
+    max_entries: int = 1024
+    _memo: OrderedDict[tuple[str, tuple[str, ...], str, bool], ScenarioResponse] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def scenario(self, hazard: HazardType, geography: Iterable[str] | None = None) -> ScenarioResponse:
+        return self._memoized(hazard, geography, fetch_population=self.population_fetcher is not None)
+
+    def precompute(self, hazards: Iterable[HazardType] = HazardType) -> None:
+        """Warm full-dataset scenarios from NRI alone, so startup never calls Data Commons."""
+        for hazard in hazards:
+            self._memoized(hazard, None, fetch_population=False)
+
+    def _memoized(
+        self, hazard: HazardType, geography: Iterable[str] | None, *, fetch_population: bool
+    ) -> ScenarioResponse:
+        entries = tuple(sorted({entry.strip().lower() for entry in geography or []}))
+        key = (hazard.value.lower(), entries, self.store.version, fetch_population)
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+        response = self._compute(hazard, list(entries), fetch_population=fetch_population)
+        with self._lock:
+            self._memo[key] = response
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return response
+
+    def _compute(self, hazard: HazardType, geography: list[str], *, fetch_population: bool) -> ScenarioResponse:
+        states, county_fips = split_geography_filter(geography)
+        rows = self.store.select([hazard.value], states=states, county_fips=county_fips)
+        eal = self.store.columns["eal"][rows]
+        fips = self.store.columns["county_fips"][rows].tolist()
+        population = self.store.columns["population"][rows].astype(np.float64)
+        population_source = "FEMA NRI"
+        if fetch_population and self.population_fetcher is not None and fips:
+            fetched = self.population_fetcher(fips)
+            population = np.array([fetched.get(code, value) for code, value in zip(fips, population)])
+            population_source = "Data Commons Count_Person"
+
+        scope = ", ".join(entry.upper() for entry in geography) if geography else "all counties"
+        if not rows.size:
+            return ScenarioResponse(
+                scenario=hazard,
+                summary=f"No {hazard.value} exposure in the NRI data for {scope}.",
+                metrics={"risk_score": 0.0, "exposed_population": 0, "county_count": 0, "data_version": self.store.version},
+                recommended_actions=BASE_ACTIONS,
+                artifacts=[],
+            )
+
+        total_population = float(population.sum())
+        weights = population if total_population > 0 else None
+        top = int(np.argmax(eal))
+        top_county = f"{self.store.columns['county'][rows[top]]} ({fips[top]})"
+        metrics = {
+            "risk_score": round(float(np.average(eal, weights=weights)), 4),
+            "exposed_population": int(total_population),
+            "county_count": int(rows.size),
+            "total_expected_annual_loss": round(float(eal.sum()), 4),
+            "max_expected_annual_loss": float(eal[top]),
+            "mean_resilience_index": round(float(self.store.columns["resilience_index"][rows].mean()), 4),
+            "top_county": top_county,
+            "population_source": population_source,
+            "data_version": self.store.version,
+        }
+        return ScenarioResponse(
+            scenario=hazard,
+            summary=(
+                f"{hazard.value.capitalize()} scenario for {scope}: {rows.size} counties, "
+                f"{int(total_population):,} residents exposed; highest EAL in {top_county}."
+            ),
+            metrics=metrics,
+            recommended_actions=[f"Prioritize mitigation in {top_county}", *BASE_ACTIONS],
+            artifacts=[],
+        )
+
+
+@lru_cache(maxsize=1)
+def get_scenario_engine() -> ScenarioEngine:
+    settings = get_settings()
+    fetcher = datacommons_population if settings.scenario_population_source == "datacommons" else None
+    return ScenarioEngine(store=get_nri_store(), population_fetcher=fetcher)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import multiprocessing
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..config import get_settings
+
+# Offline stand-ins for NRI annualized event frequencies (events per county-year).
+DEFAULT_ANNUAL_FREQUENCY: dict[str, float] = {
+    "hurricane": 0.25,
+    "flood": 0.6,
+    "wildfire": 0.15,
+}
+DEFAULT_RETURN_PERIODS = (10, 50, 100, 250)
+
+
+@dataclass(frozen=True)
+class StressCells:
+    """Per county-hazard exposure cells driving the simulation.
+
+    ``eal`` is the NRI expected annual loss ratio and ``frequency`` the annual event
+    rate, so the mean per-event loss ratio is ``eal / frequency``.
+    """
+
+    tiv: np.ndarray
+    eal: np.ndarray
+    frequency: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.tiv)
+
+
+def build_stress_cells(
+    located: pd.DataFrame,
+    nri: pd.DataFrame,
+    frequencies: Mapping[str, float] | None = None,
+) -> StressCells:
+    """Join geocoded locations to NRI rows, one cell per (county, hazard) with exposure."""
+    rates = {**DEFAULT_ANNUAL_FREQUENCY, **(frequencies or {})}
+    exposure = (
+        located[located["county_fips"] != ""].groupby("county_fips", sort=False)["tiv"].sum().rename("tiv").reset_index()
+    )
+    joined = nri[["county_fips", "hazard_type", "eal"]].merge(exposure, on="county_fips", how="inner")
+    frequency = joined["hazard_type"].map(rates).fillna(min(rates.values()))
+    return StressCells(
+        tiv=joined["tiv"].to_numpy(dtype=np.float64),
+        eal=joined["eal"].to_numpy(dtype=np.float64),
+        frequency=frequency.to_numpy(dtype=np.float64),
+    )
+
+
+def _sparse_poisson(
+    rng: np.random.Generator, rates: np.ndarray, years: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Poisson event counts for a ``years x cells`` grid, returned only where non-zero.
+
+    One uniform per cell-year decides "no event" against ``exp(-rate)``; the remaining
+    cell-years walk the Poisson CDF together, one vectorized step per count value.
+    For the low annual rates of county hazards this is far cheaper than
+    ``Generator.poisson`` and never materialises the zero cells.
+    """
+    uniforms = rng.random((years, len(rates)))
+    year_index, cell_index = np.nonzero(uniforms > np.exp(-rates))
+    u = uniforms[year_index, cell_index]
+    del uniforms
+    lam = rates[cell_index]
+    pmf = np.exp(-lam)
+    cdf = pmf.copy()
+    counts = np.zeros(len(u), dtype=np.int64)
+    active = np.arange(len(u))
+    k = 0
+    while active.size:
+        k += 1
+        pmf[active] *= lam[active] / k
+        cdf[active] += pmf[active]
+        counts[active] = k
+        # Entries whose pmf underflowed cannot advance further; stop them at this count.
+        active = active[(u[active] > cdf[active]) & (pmf[active] > 0)]
+    return year_index, cell_index, counts
+
+
+def _simulate_chunk(
+    cells: StressCells, years: int, seed: np.random.SeedSequence, severity_shape: float
+) -> np.ndarray:
+    """Annual portfolio losses for ``years`` simulated years, without per-event loops.
+
+    Event counts are Poisson; each event's loss ratio is Gamma(shape, mean / shape), and
+    the sum of ``n`` such draws is Gamma(n * shape, mean / shape), so one gamma draw per
+    cell-year covers every event in that year.
+    """
+    rng = np.random.default_rng(seed)
+    year_index, cell_index, counts = _sparse_poisson(rng, cells.frequency, years)
+    event_mean = np.divide(cells.eal, cells.frequency, out=np.zeros_like(cells.eal), where=cells.frequency > 0)
+    ratios = rng.gamma(counts * severity_shape, event_mean[cell_index] / severity_shape)
+    losses = np.minimum(ratios, 1.0) * cells.tiv[cell_index]
+    return np.bincount(year_index, weights=losses, minlength=years)
+
+
+# Cells of the run a pool worker serves, set once per worker by ``_init_worker``.
+_worker_cells: StressCells | None = None
+
+
+def _init_worker(cells: StressCells) -> None:
+    global _worker_cells
+    _worker_cells = cells
+
+
+def _simulate_worker_chunk(years: int, seed: np.random.SeedSequence, severity_shape: float) -> np.ndarray:
+    assert _worker_cells is not None, "worker started without _init_worker"
+    return _simulate_chunk(_worker_cells, years, seed, severity_shape)
+
+
+def simulate_annual_losses(
+    cells: StressCells,
+    *,
+    years: int,
+    seed: int | None = None,
+    chunk_size: int = 1_000,
+    severity_shape: float = 2.0,
+    max_workers: int = 1,
+) -> np.ndarray:
+    """Simulate ``years`` annual portfolio losses in bounded-memory chunks.
+
+    Every chunk draws from its own child of ``SeedSequence(seed)``, so a seeded run
+    returns identical losses whether chunks run serially or across a process pool.
+    """
+    if years < 1:
+        raise ValueError("years must be >= 1.")
+    if not len(cells):
+        return np.zeros(years)
+    sizes = [min(chunk_size, years - start) for start in range(0, years, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if max_workers > 1 and len(sizes) > 1:
+        # The pool lives for one run so its initializer ships the cells to each worker once,
+        # instead of pickling them with every chunk. Spawn avoids forking a process that
+        # already runs uvicorn and executor threads.
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(sizes)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(cells,),
+        ) as pool:
+            chunks = list(pool.map(_simulate_worker_chunk, sizes, seeds, [severity_shape] * len(sizes)))
+    else:
+        chunks = [_simulate_chunk(cells, size, child, severity_shape) for size, child in zip(sizes, seeds)]
+    return np.concatenate(chunks)
+
+
+def loss_metrics(
+    losses: np.ndarray,
+    *,
+    return_periods: Sequence[int] = DEFAULT_RETURN_PERIODS,
+    tvar_level: float = 0.99,
+) -> dict[str, Any]:
+    """PML per return period (loss quantile at ``1 - 1/rp``) and TVaR at ``tvar_level``."""
+    if not 0 < tvar_level < 1:
+        raise ValueError("tvar_level must be between 0 and 1.")
+    if any(period <= 1 for period in return_periods):
+        raise ValueError("Return periods must be greater than 1 year.")
+    periods = sorted(set(return_periods))
+    quantiles = np.quantile(losses, [1 - 1 / period for period in periods]) if periods else []
+    value_at_risk = float(np.quantile(losses, tvar_level))
+    tail = losses[losses >= value_at_risk]
+    return {
+        "mean_annual_loss": float(losses.mean()),
+        "pml": {str(period): float(value) for period, value in zip(periods, quantiles)},
+        "value_at_risk": {"level": tvar_level, "value": value_at_risk},
+        "tail_value_at_risk": {"level": tvar_level, "value": float(tail.mean()) if tail.size else value_at_risk},
+    }
+
+
+def run_stress(
+    cells: StressCells,
+    *,
+    simulations: int,
+    seed: int | None = None,
+    return_periods: Sequence[int] = DEFAULT_RETURN_PERIODS,
+    tvar_level: float = 0.99,
+) -> dict[str, Any]:
+    settings = get_settings()
+    workers = settings.stress_max_workers if simulations >= settings.stress_parallel_threshold else 1
+    losses = simulate_annual_losses(
+        cells,
+        years=simulations,
+        seed=seed,
+        chunk_size=max(1, settings.stress_chunk_cell_years // max(len(cells), 1)),
+        max_workers=workers,
+    )
+    return {
+        "simulations": simulations,
+        "seed": seed,
+        **loss_metrics(losses, return_periods=return_periods, tvar_level=tvar_level),
+    }
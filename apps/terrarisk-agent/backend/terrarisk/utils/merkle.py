@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from typing import Literal
+
+# Domain-separated prefixes keep a leaf from ever being mistaken for an interior node.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+ProofStep = tuple[Literal["left", "right"], str]
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """SHA-256 Merkle tree over a sequence of leaves.
+
+    An unpaired node is promoted to the next level unchanged rather than duplicated, so
+    two different leaf lists can never share a root.
+    """
+
+    def __init__(self, leaves: Sequence[bytes]) -> None:
+        if not leaves:
+            raise ValueError("A Merkle tree needs at least one leaf.")
+        level = [leaf_hash(leaf) for leaf in leaves]
+        self.levels: list[list[bytes]] = [level]
+        while len(level) > 1:
+            level = [
+                node_hash(level[index], level[index + 1]) if index + 1 < len(level) else level[index]
+                for index in range(0, len(level), 2)
+            ]
+            self.levels.append(level)
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    @property
+    def root(self) -> str:
+        return self.levels[-1][0].hex()
+
+    def proof(self, index: int) -> list[ProofStep]:
+        """Sibling hashes from leaf ``index`` up to the root."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Leaf index {index} out of range for {len(self)} leaves.")
+        steps: list[ProofStep] = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                steps.append(("left" if sibling < index else "right", level[sibling].hex()))
+            index //= 2
+        return steps
+
+
+def merkle_root(leaves: Sequence[bytes]) -> str:
+    return MerkleTree(leaves).root
+
+
+def verify_proof(leaf: bytes, proof: Sequence[ProofStep], root: str) -> bool:
+    current = leaf_hash(leaf)
+    for side, sibling in proof:
+        other = bytes.fromhex(sibling)
+        current = node_hash(other, current) if side == "left" else node_hash(current, other)
+    return current.hex() == root
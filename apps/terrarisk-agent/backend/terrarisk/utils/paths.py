@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def resolve_repo_path(configured_value: str) -> Path | None:
+    """Resolve a configured path that may be relative to the repository root.
+
+    Absolute paths and paths relative to the working directory are used as-is;
+    otherwise every parent of the package is tried, since defaults such as
+    ``packages/schemas/...`` live several levels above the backend. Returns ``None``
+    when nothing matches.
+    """
+    configured = Path(configured_value)
+    if configured.exists():
+        return configured
+    if configured.is_absolute():
+        return None
+    return next(
+        (parent / configured for parent in Path(__file__).resolve().parents if (parent / configured).exists()),
+        None,
+    )
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import operator
+import re
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from ..config import get_settings
+from .paths import resolve_repo_path
+
+Condition = Callable[[Mapping[str, Any]], bool]
+Message = Callable[[Mapping[str, Any]], str]
+
+UNDEFINED = object()
+# Reason reported for a message-less ``deny { ... }`` rule.
+DEFAULT_DENY_REASON = "denied by policy"
+COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_RULE_HEAD = re.compile(r"^(?P<name>\w+)(?:\[(?P<var>\w+)\])?\s*\{$")
+_SET_HEAD = re.compile(r"^(?P<name>\w+)\s*:=\s*\{$")
+_DEFAULT = re.compile(r"^default\s+(?P<name>\w+)\s*:=\s*(?P<value>.+)$")
+_COMPARISON = re.compile(r"^(?P<left>.+?)\s*(?P<op>==|!=|>=|<=|>|<)\s*(?P<right>.+)$")
+_MEMBERSHIP = re.compile(r"^(?P<set>\w+)\[(?P<ref>[\w.]+)\]$")
+_ASSIGN = re.compile(r"^(?P<var>\w+)\s*:=\s*(?P<expr>.+)$")
+_SPRINTF = re.compile(r'^sprintf\((?P<fmt>"(?:[^"\\]|\\.)*")\s*,\s*\[(?P<args>[^\]]*)\]\)$')
+
+
+class PolicyError(ValueError):
+    """Raised when the policy bundle uses Rego outside the supported subset."""
+
+
+def _resolve(document: Mapping[str, Any], path: tuple[str, ...]) -> Any:
+    value: Any = document
+    for key in path:
+        if not isinstance(value, Mapping) or key not in value:
+            return UNDEFINED
+        value = value[key]
+    return value
+
+
+def _operand(token: str) -> Callable[[Mapping[str, Any]], Any]:
+    token = token.strip()
+    if token.startswith('"'):
+        literal = json.loads(token)
+        return lambda document: literal
+    if token in ("true", "false"):
+        flag = token == "true"
+        return lambda document: flag
+    if re.fullmatch(r"-?\d+(\.\d+)?", token):
+        number = float(token)
+        return lambda document: number
+    if re.fullmatch(r"input(\.\w+)+", token):
+        path = tuple(token.split(".")[1:])
+        return lambda document: _resolve(document, path)
+    raise PolicyError(f"Unsupported operand {token!r}.")
+
+
+def _condition(expression: str, sets: Mapping[str, frozenset[Any]]) -> Condition:
+    if expression.startswith("not "):
+        inner = _operand(expression[4:])
+        return lambda document: inner(document) in (UNDEFINED, False)
+    if match := _MEMBERSHIP.match(expression):
+        members = sets.get(match["set"])
+        if members is None:
+            raise PolicyError(f"Unknown set {match['set']!r}.")
+        value = _operand(match["ref"])
+        return lambda document: value(document) in members
+    if match := _COMPARISON.match(expression):
+        left, right, compare = _operand(match["left"]), _operand(match["right"]), COMPARISONS[match["op"]]
+
+        def compared(document: Mapping[str, Any]) -> bool:
+            a, b = left(document), right(document)
+            if a is UNDEFINED or b is UNDEFINED:
+                return False
+            try:
+                return bool(compare(a, b))
+            except TypeError:
+                return False
+
+        return compared
+    value = _operand(expression)
+    return lambda document: value(document) not in (UNDEFINED, False)
+
+
+def _message(expression: str) -> Message:
+    if match := _SPRINTF.match(expression):
+        template = json.loads(match["fmt"]).replace("%v", "%s")
+        args = [_operand(arg) for arg in match["args"].split(",") if arg.strip()]
+        return lambda document: template % tuple(
+            "<undefined>" if (value := arg(document)) is UNDEFINED else value for arg in args
+        )
+    literal = _operand(expression)
+    return lambda document: str(literal(document))
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    conditions: tuple[Condition, ...]
+    message: Message | None = None
+
+    def matches(self, document: Mapping[str, Any]) -> bool:
+        return all(condition(document) for condition in self.conditions)
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """The ``allow`` and ``deny`` rules of a bundle, compiled to Python closures."""
+
+    package: str
+    defaults: Mapping[str, Any]
+    allow: tuple[CompiledRule, ...]
+    deny: tuple[CompiledRule, ...]
+
+    def evaluate(self, document: Mapping[str, Any]) -> PolicyDecision:
+        reasons = tuple(
+            rule.message(document) if rule.message else DEFAULT_DENY_REASON
+            for rule in self.deny
+            if rule.matches(document)
+        )
+        allowed = any(rule.matches(document) for rule in self.allow) or self.defaults.get("allow") is True
+        if not allowed and not reasons:
+            reasons = ("no allow rule matched",)
+        return PolicyDecision(allowed=allowed and not reasons, reasons=reasons)
+
+
+def compile_policy(source: str) -> CompiledPolicy:
+    """Compile the Rego subset used by ``policy.rego``.
+
+    Supported: ``default`` values, set constants, and ``allow { ... }`` /
+    ``deny[msg] { ... }`` bodies whose lines are ``not <ref>``, comparisons, set
+    membership, bare refs, and a ``msg :=`` string or ``sprintf`` assignment.
+    Anything else raises :class:`PolicyError` rather than being silently ignored.
+    """
+    lines = [line.split("#", 1)[0].strip() for line in source.splitlines()]
+    lines = [line for line in lines if line]
+    package = ""
+    defaults: dict[str, Any] = {}
+    sets: dict[str, frozenset[Any]] = {}
+    bodies: list[tuple[str, str | None, list[str]]] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        end = next((position for position in range(index, len(lines)) if lines[position] == "}"), len(lines))
+        if line.startswith("package "):
+            package = line.split(None, 1)[1]
+        elif match := _DEFAULT.match(line):
+            defaults[match["name"]] = json.loads(match["value"])
+        elif match := _SET_HEAD.match(line):
+            items = " ".join(lines[index + 1 : end]).rstrip(",")
+            sets[match["name"]] = frozenset(json.loads(f"[{items}]"))
+            index = end
+        elif match := _RULE_HEAD.match(line):
+            bodies.append((match["name"], match["var"], lines[index + 1 : end]))
+            index = end
+        else:
+            raise PolicyError(f"Unsupported policy statement {line!r}.")
+        index += 1
+
+    allow: list[CompiledRule] = []
+    deny: list[CompiledRule] = []
+    for name, var, body in bodies:
+        conditions: list[Condition] = []
+        message: Message | None = None
+        for expression in body:
+            assignment = _ASSIGN.match(expression)
+            if var is not None and assignment and assignment["var"] == var:
+                message = _message(assignment["expr"])
+            else:
+                conditions.append(_condition(expression, sets))
+        rule = CompiledRule(name=name, conditions=tuple(conditions), message=message)
+        if name == "allow":
+            allow.append(rule)
+        elif name == "deny":
+            deny.append(rule)
+    return CompiledPolicy(package=package, defaults=defaults, allow=tuple(allow), deny=tuple(deny))
+
+
+@dataclass(frozen=True)
+class PolicyDecision:
+    allowed: bool
+    reasons: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class PolicyRequest:
+    """Everything a decision depends on; hashable, so it doubles as the memo key."""
+
+    action: str
+    mode: str
+    role: str = "system"
+    flags: frozenset[str] = frozenset()
+    geo_precision: str | None = None
+    estimated_cost: float | None = None
+    remaining_budget: float | None = None
+
+    def document(self) -> dict[str, Any]:
+        request: dict[str, Any] = {"action": self.action, "mode": self.mode, "actor": {"role": self.role}}
+        context: dict[str, Any] = {
+            "flags": {flag: True for flag in self.flags if flag != "pii_unlocked"},
+            "pii_unlocked": "pii_unlocked" in self.flags,
+        }
+        if self.geo_precision is not None:
+            request["scope"] = {"geo_precision": self.geo_precision}
+        if self.estimated_cost is not None:
+            request["cost"] = {"estimated": self.estimated_cost}
+        if self.remaining_budget is not None:
+            context["budget"] = {"remaining": self.remaining_budget}
+        return {"request": request, "context": context}
+
+
+@dataclass
+class PolicyEngine:
+    """In-process evaluator for the OPA bundle with memoized decisions.
+
+    The bundle is compiled once and recompiled when its mtime changes (checked at
+    most every ``reload_interval`` seconds); a reload drops every memoized decision.
+    """
+
+    path: Path
+    reload_interval: float = 1.0
+    max_entries: int = 4096
+    _policy: CompiledPolicy | None = field(default=None, init=False, repr=False)
+    _digest: str = field(default="", init=False, repr=False)
+    _mtime: float = field(default=0.0, init=False, repr=False)
+    _checked_at: float = field(default=0.0, init=False, repr=False)
+    _decisions: dict[PolicyRequest, tuple[str, PolicyDecision]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def decide(self, request: PolicyRequest) -> PolicyDecision:
+        self._maybe_reload()
+        # Lookup, evaluation and insert share the lock with reloads, and each decision is
+        # stored with the digest of the bundle that made it, so a decision from a
+        # replaced bundle is never served or stored under the new one.
+        with self._lock:
+            cached = self._decisions.get(request)
+            if cached is not None and cached[0] == self._digest:
+                return cached[1]
+            assert self._policy is not None
+            decision = self._policy.evaluate(request.document())
+            if len(self._decisions) >= self.max_entries:
+                self._decisions.clear()
+            self._decisions[request] = (self._digest, decision)
+        return decision
+
+    @property
+    def version(self) -> str:
+        """SHA-256 of the loaded bundle source, refreshed like the compiled policy."""
+        self._maybe_reload()
+        return self._digest
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if self._policy is not None and now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtime = self.path.stat().st_mtime
+            if self._policy is None or mtime != self._mtime:
+                source = self.path.read_text()
+                self._policy = compile_policy(source)
+                self._digest = hashlib.sha256(source.encode()).hexdigest()
+                self._mtime = mtime
+                self._decisions.clear()
+
+
+@lru_cache(maxsize=1)
+def get_policy_engine() -> PolicyEngine | None:
+    """Process-wide engine, or ``None`` when enforcement is off."""
+    settings = get_settings()
+    if settings.policy_enforcement == "off":
+        return None
+    path = resolve_repo_path(settings.policy_bundle_path)
+    if path is None:
+        raise FileNotFoundError(
+            f"Policy bundle not found at {settings.policy_bundle_path!r}; "
+            "set POLICY_BUNDLE_PATH or POLICY_ENFORCEMENT=off."
+        )
+    return PolicyEngine(path=path)
+
+
+def policy_fingerprint() -> str:
+    """Everything about the policy that can change a run's outcome, for result-cache keys."""
+    settings = get_settings()
+    engine = get_policy_engine()
+    if engine is None:
+        return "off"
+    return f"{settings.policy_enforcement}:{settings.policy_actor_role}:{engine.version}"
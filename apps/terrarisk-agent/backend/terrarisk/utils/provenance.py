@@ -1,23 +1,96 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
 import uuid
-from datetime import datetime, timezone
-from pathlib import Path
-from typing import Any, Sequence
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Any, Literal
+
+import structlog
+from jsonschema import Draft7Validator
 
 from ..config import get_settings
-from ..models.domain import ActionCredential, Artifact
+from ..models.domain import ActionCredential, Artifact, ManifestLeaf, RunManifest
+from .merkle import MerkleTree, ProofStep
+from .paths import resolve_repo_path
+
+logger = structlog.get_logger(__name__)
+
+AGENT_ACTOR = {"name": "TerraRisk Agent", "role": "system", "identity": "urn:terrarisk:agent"}
+
+
+class CredentialValidationError(ValueError):
+    """Raised when credentials do not conform to the Action Credential schema."""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__(f"{len(errors)} Action Credential schema violation(s): " + "; ".join(errors[:5]))
+        self.errors = errors
 
 
+@lru_cache(maxsize=1)
 def load_schema() -> dict[str, Any]:
-    settings = get_settings()
-    schema_path = Path(settings.action_credential_schema_path)
-    if schema_path.exists():
+    """Action Credential JSON schema, read once per process (empty if it cannot be found)."""
+    schema_path = resolve_repo_path(get_settings().action_credential_schema_path)
+    if schema_path is not None:
         return json.loads(schema_path.read_text())
     return {}
 
 
+@dataclass(frozen=True)
+class CredentialSpec:
+    """Inputs for one credential in a :func:`build_action_credentials` batch."""
+
+    action_type: str
+    inputs: Sequence[str]
+    outputs: Sequence[str]
+    source: str
+    artifacts: Sequence[Artifact] = ()
+    claims: Sequence[dict[str, Any]] = ()
+    mode: str | None = None
+
+
+def build_action_credentials(specs: Iterable[CredentialSpec]) -> list[ActionCredential]:
+    """Emit every credential of a batch in one pass.
+
+    The batch shares one timestamp and one uuid4 (credential ids are ``<batch>.<n>``),
+    and models are built with ``model_construct`` since every field comes from trusted
+    internal values; schema conformance is checked separately.
+    """
+    batch_id = str(uuid.uuid4())
+    timestamp = datetime.now(UTC)
+    return [
+        ActionCredential.model_construct(
+            version="0.1.0",
+            id=f"{batch_id}.{index}",
+            timestamp=timestamp,
+            actor=dict(AGENT_ACTOR),
+            action={
+                "type": spec.action_type,
+                "inputs": list(spec.inputs),
+                "outputs": list(spec.outputs),
+                "source": _source(spec),
+            },
+            artifacts=list(spec.artifacts),
+            claims=list(spec.claims),
+            signatures=[],
+            trace=None,
+        )
+        for index, spec in enumerate(specs)
+    ]
+
+
+def _source(spec: CredentialSpec) -> dict[str, str]:
+    source = {"system": spec.source, "reference": spec.source}
+    if spec.mode is not None:
+        source["mode"] = spec.mode
+    return source
+
+
 def create_action_credential(
     *,
     action_type: str,
@@ -28,20 +101,138 @@ def create_action_credential(
     claims: Sequence[dict[str, Any]] | None = None,
     mode: str | None = None,
 ) -> ActionCredential:
-    claims = claims or []
-    credential = ActionCredential(
-        id=str(uuid.uuid4()),
-        timestamp=datetime.now(timezone.utc),
-        actor={"name": "TerraRisk Agent", "role": "system"},
-        action={
-            "type": action_type,
-            "inputs": list(inputs),
-            "outputs": list(outputs),
-            "source": {"system": source, "reference": source, "mode": mode},
-        },
-        artifacts=list(artifacts),
-        claims=claims,
-        signatures=[],
-        trace=None,
+    spec = CredentialSpec(
+        action_type=action_type,
+        inputs=inputs,
+        outputs=outputs,
+        source=source,
+        artifacts=artifacts,
+        claims=claims or (),
+        mode=mode,
+    )
+    return build_action_credentials([spec])[0]
+
+
+def credential_digest(credential: ActionCredential) -> str:
+    """SHA-256 of the credential's canonical JSON, excluding signatures so signing keeps it stable."""
+    payload = credential.model_dump(mode="json", exclude={"signatures"})
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _leaf_bytes(leaf: ManifestLeaf) -> bytes:
+    return f"{leaf.kind}:{leaf.ref}:{leaf.digest}".encode()
+
+
+def _manifest_leaves(artifacts: Sequence[Artifact], credentials: Sequence[ActionCredential]) -> list[ManifestLeaf]:
+    leaves = [ManifestLeaf(kind="artifact", ref=artifact.uri, digest=artifact.hash or "") for artifact in artifacts]
+    leaves.extend(
+        ManifestLeaf(kind="credential", ref=credential.id, digest=credential_digest(credential))
+        for credential in credentials
     )
-    return credential
+    return leaves
+
+
+def build_run_manifest(
+    run_id: str, artifacts: Sequence[Artifact], credentials: Sequence[ActionCredential]
+) -> RunManifest:
+    leaves = _manifest_leaves(artifacts, credentials)
+    root = MerkleTree([_leaf_bytes(leaf) for leaf in leaves]).root
+    return RunManifest(run_id=run_id, merkle_root=root, leaves=leaves)
+
+
+def verify_run_manifest(
+    manifest: RunManifest, artifacts: Sequence[Artifact], credentials: Sequence[ActionCredential]
+) -> bool:
+    """Recompute the root from the run's artifacts and credentials; one comparison verifies all of them."""
+    leaves = _manifest_leaves(artifacts, credentials)
+    return bool(leaves) and MerkleTree([_leaf_bytes(leaf) for leaf in leaves]).root == manifest.merkle_root
+
+
+def manifest_proof(manifest: RunManifest, ref: str) -> tuple[bytes, list[ProofStep]]:
+    """Leaf bytes and inclusion proof for one artifact URI or credential id (see ``merkle.verify_proof``)."""
+    leaves = [_leaf_bytes(leaf) for leaf in manifest.leaves]
+    index = next((position for position, leaf in enumerate(manifest.leaves) if leaf.ref == ref), None)
+    if index is None:
+        raise KeyError(f"{ref!r} is not part of run {manifest.run_id}.")
+    return leaves[index], MerkleTree(leaves).proof(index)
+
+
+@dataclass
+class CredentialValidator:
+    """Schema validator compiled once and reused for every credential.
+
+    ``mode="sync"`` raises :class:`CredentialValidationError` on the calling thread;
+    ``mode="async"`` validates on a background thread and only records and logs
+    violations, keeping validation off the request path; ``mode="off"`` skips it.
+    """
+
+    schema: dict[str, Any]
+    mode: Literal["off", "sync", "async"] = "sync"
+    validated: int = field(default=0, init=False)
+    failed: int = field(default=0, init=False)
+    _validator: Draft7Validator = field(init=False, repr=False)
+    _pool: ThreadPoolExecutor | None = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        Draft7Validator.check_schema(self.schema)
+        self._validator = Draft7Validator(self.schema, format_checker=Draft7Validator.FORMAT_CHECKER)
+
+    def errors(self, credentials: Sequence[ActionCredential]) -> list[str]:
+        """Every violation across the batch, prefixed with the offending credential id."""
+        errors: list[str] = []
+        failed = 0
+        for credential in credentials:
+            found = [
+                f"{credential.id}: {'/'.join(map(str, error.absolute_path)) or '<root>'}: {error.message}"
+                for error in self._validator.iter_errors(credential.model_dump(mode="json", exclude={"trace"}))
+            ]
+            failed += bool(found)
+            errors.extend(found)
+        with self._lock:
+            self.validated += len(credentials)
+            self.failed += failed
+        return errors
+
+    def validate(self, credentials: Sequence[ActionCredential]) -> None:
+        errors = self.errors(credentials)
+        if errors:
+            raise CredentialValidationError(errors)
+
+    def submit(self, credentials: Sequence[ActionCredential]) -> Future[list[str]]:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="credential-validation")
+        future = self._pool.submit(self.errors, list(credentials))
+        future.add_done_callback(_log_violations)
+        return future
+
+    def check(self, credentials: Sequence[ActionCredential]) -> None:
+        """Validate according to ``mode``; the single entry point used by the analysis pipeline."""
+        if self.mode == "sync":
+            self.validate(credentials)
+        elif self.mode == "async":
+            self.submit(credentials)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, "validated": self.validated, "failed": self.failed}
+
+
+def _log_violations(future: Future[list[str]]) -> None:
+    errors = future.exception() or future.result()
+    if errors:
+        logger.warning("action_credential_schema_violation", errors=errors)
+
+
+@lru_cache(maxsize=1)
+def get_credential_validator() -> CredentialValidator:
+    settings = get_settings()
+    schema = load_schema()
+    if not schema and settings.credential_validation != "off":
+        raise FileNotFoundError(
+            f"Action Credential schema not found at {settings.action_credential_schema_path!r}; "
+            "set ACTION_CREDENTIAL_SCHEMA_PATH or CREDENTIAL_VALIDATION=off."
+        )
+    return CredentialValidator(schema=schema, mode=settings.credential_validation)
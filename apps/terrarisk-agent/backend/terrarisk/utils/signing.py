@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Protocol
+
+import structlog
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+
+from ..config import get_settings
+from ..models.domain import ActionCredential, RunManifest
+
+logger = structlog.get_logger(__name__)
+
+LOCAL_METHOD_PREFIX = "local-ed25519:"
+
+
+def key_fingerprint(public_key: bytes) -> str:
+    """Short SHA-256 fingerprint of a raw public key, used as the local key id."""
+    return hashlib.sha256(public_key).hexdigest()[:16]
+
+
+class Signer(Protocol):
+    signature_type: str
+    verification_method: str
+    public_key: str
+
+    def sign(self, payload: bytes) -> str:
+        ...
+
+    def verify(self, payload: bytes, signature: str) -> bool:
+        ...
+
+
+@dataclass
+class LocalKeySigner(Signer):
+    """Ed25519 signer backed by a local key, for offline runs and tests.
+
+    Signatures and ``public_key`` are base64; ``verification_method`` is
+    ``local-ed25519:<key id>``, where the key id is :func:`key_fingerprint` of the
+    public key.
+    """
+
+    private_key: Ed25519PrivateKey = field(default_factory=Ed25519PrivateKey.generate)
+    signature_type: str = "local_ed25519"
+    key_id: str = field(init=False)
+    public_key: str = field(init=False)
+    verification_method: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        public = self.private_key.public_key().public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        self.key_id = key_fingerprint(public)
+        self.public_key = base64.b64encode(public).decode()
+        self.verification_method = f"{LOCAL_METHOD_PREFIX}{self.key_id}"
+
+    @classmethod
+    def from_path(cls, path: Path) -> LocalKeySigner:
+        """Load a PEM (PKCS#8) key, generating and saving one on first use."""
+        if path.exists():
+            key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+            if not isinstance(key, Ed25519PrivateKey):
+                raise ValueError(f"{path} does not contain an Ed25519 private key.")
+            return cls(private_key=key)
+        signer = cls()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(
+            signer.private_key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            )
+        )
+        path.chmod(0o600)
+        return signer
+
+    def sign(self, payload: bytes) -> str:
+        return base64.b64encode(self.private_key.sign(payload)).decode()
+
+    def verify(self, payload: bytes, signature: str) -> bool:
+        try:
+            self.private_key.public_key().verify(base64.b64decode(signature), payload)
+        except (InvalidSignature, ValueError):
+            return False
+        return True
+
+
+def manifest_payload(manifest: RunManifest) -> bytes:
+    """Canonical bytes signed for a run: the manifest without its signatures."""
+    payload = manifest.model_dump(mode="json", exclude={"signatures"})
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+def verify_manifest_signatures(manifest: RunManifest, trusted_key_ids: Sequence[str] | None = None) -> bool:
+    """Verify a manifest's local Ed25519 signatures using the public keys they carry.
+
+    Needs no signer, so manifests stay verifiable after the signing process (and an
+    ephemeral key) is gone. Pass ``trusted_key_ids`` to also pin which keys may sign.
+    """
+    if not manifest.signatures:
+        return False
+    payload = manifest_payload(manifest)
+    for entry in manifest.signatures:
+        if not str(entry.get("verification_method", "")).startswith(LOCAL_METHOD_PREFIX):
+            return False
+        try:
+            public = base64.b64decode(entry["public_key"])
+            key_id = entry["verification_method"].removeprefix(LOCAL_METHOD_PREFIX)
+            if key_fingerprint(public) != key_id or (trusted_key_ids is not None and key_id not in trusted_key_ids):
+                return False
+            Ed25519PublicKey.from_public_bytes(public).verify(base64.b64decode(entry["signature"]), payload)
+        except (KeyError, ValueError, InvalidSignature):
+            return False
+    return True
+
+
+@dataclass
+class SigningPipeline:
+    """Signs one Merkle manifest per run rather than every artifact and credential.
+
+    The manifest root commits to every artifact hash and credential digest, so one
+    signature covers the run; each credential carries that signature plus the root it
+    applies to.
+    """
+
+    signer: Signer
+
+    def signature(self, manifest: RunManifest) -> dict[str, Any]:
+        return {
+            "type": self.signer.signature_type,
+            "signature": self.signer.sign(manifest_payload(manifest)),
+            "verification_method": self.signer.verification_method,
+            "public_key": self.signer.public_key,
+            "manifest_root": manifest.merkle_root,
+        }
+
+    def sign_run(
+        self, manifest: RunManifest, credentials: Sequence[ActionCredential]
+    ) -> tuple[RunManifest, list[ActionCredential]]:
+        """Return the signed manifest and credentials; the inputs are left untouched."""
+        entry = self.signature(manifest)
+        signed_credentials = [
+            credential.model_copy(update={"signatures": [*credential.signatures, entry]}) for credential in credentials
+        ]
+        return manifest.model_copy(update={"signatures": [entry]}), signed_credentials
+
+    def verify(self, manifest: RunManifest) -> bool:
+        payload = manifest_payload(manifest)
+        return bool(manifest.signatures) and all(
+            entry["verification_method"] == self.signer.verification_method
+            and self.signer.verify(payload, entry["signature"])
+            for entry in manifest.signatures
+        )
+
+
+@lru_cache(maxsize=1)
+def get_signing_pipeline() -> SigningPipeline | None:
+    """Process-wide pipeline, or ``None`` when ``SIGNING_BACKEND=off``.
+
+    Without ``SIGNING_KEY_PATH`` the local backend signs with an ephemeral key that
+    lives only as long as the process; its public key still travels with every
+    signature, so :func:`verify_manifest_signatures` works after a restart.
+    """
+    settings = get_settings()
+    if settings.signing_backend == "off":
+        return None
+    signer: Signer
+    if settings.signing_key_path:
+        key_path = Path(settings.signing_key_path)
+        if not key_path.is_absolute():
+            key_path = Path(__file__).resolve().parent.parent / key_path
+        signer = LocalKeySigner.from_path(key_path)
+    else:
+        signer = LocalKeySigner()
+        logger.warning("signing_key_ephemeral", key_id=signer.key_id)
+    return SigningPipeline(signer=signer)
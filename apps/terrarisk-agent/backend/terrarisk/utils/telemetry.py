@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from opentelemetry import metrics, trace
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import MetricReader, PeriodicExportingMetricReader
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span
+
+from ..config import Settings, get_settings
+
+# Proxies: they no-op until configure_telemetry installs real providers.
+tracer = trace.get_tracer("terrarisk")
+meter = metrics.get_meter("terrarisk")
+phase_duration = meter.create_histogram(
+    "terrarisk.phase.duration", unit="ms", description="Latency of analysis, connector and report phases."
+)
+bytes_written = meter.create_histogram(
+    "terrarisk.artifact.bytes", unit="By", description="Size of report artifacts as written."
+)
+
+_configured = False
+_lock = threading.Lock()
+
+
+def configure_telemetry(
+    settings: Settings | None = None,
+    *,
+    span_exporter: SpanExporter | None = None,
+    metric_reader: MetricReader | None = None,
+) -> bool:
+    """Install OTLP tracer and meter providers once per process.
+
+    Exporting only happens when ``OTEL_EXPORTER_OTLP_ENDPOINT`` is set (or an exporter
+    is passed in, as tests do); otherwise spans and histograms stay no-ops. Spans are
+    shipped by a ``BatchSpanProcessor`` on a background thread, so the request path
+    only pays for recording them. Returns whether providers were installed.
+    """
+    global _configured
+    settings = settings or get_settings()
+    endpoint = settings.otel_exporter_otlp_endpoint
+    with _lock:
+        if _configured or (endpoint is None and span_exporter is None):
+            return _configured
+        if span_exporter is None or metric_reader is None:
+            from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
+                OTLPMetricExporter,
+            )
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            span_exporter = span_exporter or OTLPSpanExporter(endpoint=endpoint)
+            metric_reader = metric_reader or PeriodicExportingMetricReader(
+                OTLPMetricExporter(endpoint=endpoint),
+                export_interval_millis=settings.otel_metric_export_interval_ms,
+            )
+        resource = Resource.create({"service.name": settings.otel_service_name})
+        tracer_provider = TracerProvider(
+            resource=resource, sampler=ParentBased(TraceIdRatioBased(settings.otel_traces_sampler_ratio))
+        )
+        tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        trace.set_tracer_provider(tracer_provider)
+        metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[metric_reader]))
+        _configured = True
+        return True
+
+
+@contextmanager
+def phase(name: str, **attributes: Any) -> Iterator[Span]:
+    """Trace a hot-path phase as a span and record its latency in ``terrarisk.phase.duration``."""
+    started = time.perf_counter()
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        try:
+            yield span
+        finally:
+            phase_duration.record((time.perf_counter() - started) * 1000, {"phase": name})
+
+
+def record_bytes(media_type: str, size: int) -> None:
+    bytes_written.record(size, {"media_type": media_type})
@@ -1,5 +1,10 @@
-from terrarisk.models.domain import AnalysisMode, AnalysisRequest
-from terrarisk.services.analysis import run_analysis
+from pathlib import Path
+
+import pytest
+
+from terrarisk import config
+from terrarisk.models.domain import AnalysisMode, AnalysisRequest, HazardType
+from terrarisk.services.analysis import GeographyFilterError, run_analysis
 
 
 def test_run_analysis_offline_generates_artifacts(tmp_path, monkeypatch):
@@ -13,3 +18,51 @@ def test_run_analysis_offline_generates_artifacts(tmp_path, monkeypatch):
     assert response.artifacts, "Expected offline mode to produce artifacts"
     assert response.action_credentials, "Expected provenance credentials per step"
     assert any("report.compose" in cred.action["type"] for cred in response.action_credentials)
+    assert {execution.status for execution in response.executions} == {"succeeded"}
+
+
+def test_run_analysis_top_k_limits_ranked_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path))
+    config.get_settings.cache_clear()
+
+    request = AnalysisRequest(
+        query="Top hurricane counties",
+        mode=AnalysisMode.OFFLINE,
+        hazards=[HazardType.HURRICANE],
+        top_k=2,
+    )
+
+    response = run_analysis(request)
+
+    csv_artifact = next(artifact for artifact in response.artifacts if artifact.type == "text/csv")
+    lines = Path(csv_artifact.uri).read_text().splitlines()
+    assert lines[0] == "portfolio_id,county_fips,hazard,eal"
+    assert [line.split(",")[1] for line in lines[1:]] == ["22071", "12086"]
+    config.get_settings.cache_clear()
+
+
+def test_run_analysis_rejects_unknown_geography():
+    request = AnalysisRequest(
+        query="Gulf hurricanes",
+        mode=AnalysisMode.OFFLINE,
+        geography_filter=[" la", "12086", "XX", "1208"],
+    )
+
+    with pytest.raises(GeographyFilterError) as excinfo:
+        run_analysis(request)
+    assert "'XX', '1208'" in str(excinfo.value)
+
+
+def test_run_analysis_cloud_without_gcp_skips_bigquery(monkeypatch):
+    for env in ("GCP_PROJECT", "BQ_DATASET"):
+        monkeypatch.delenv(env, raising=False)
+    # The shipped policy bundle allows cloud runs only for admins.
+    monkeypatch.setenv("POLICY_ACTOR_ROLE", "admin")
+    config.get_settings.cache_clear()
+    try:
+        response = run_analysis(AnalysisRequest(query="Gulf hurricanes", mode=AnalysisMode.CLOUD))
+    finally:
+        config.get_settings.cache_clear()
+
+    assert response.artifacts
+    assert {execution.status for execution in response.executions} == {"succeeded"}
@@ -28,3 +28,12 @@ def test_analyze_endpoint_generates_artifacts(tmp_path, monkeypatch):
         assert str(path).startswith(str(tmp_path))
 
     config.get_settings.cache_clear()
+
+
+def test_analyze_rejects_unknown_geography_with_400():
+    client = TestClient(app)
+    payload = {"query": "Gulf hurricanes", "mode": "offline", "geography_filter": ["Florida"]}
+
+    response = client.post("/analyze", json=payload)
+    assert response.status_code == 400
+    assert "Florida" in response.json()["detail"]
@@ -1,4 +1,16 @@
-from terrarisk.connectors.bigquery_ee import _infer_bigquery_scalar_type
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pandas as pd
+
+from terrarisk.connectors.bigquery_ee import (
+    BigQueryEarthEngineClient,
+    BigQueryStubClient,
+    RegionStatsRequest,
+    _infer_bigquery_scalar_type,
+)
+from terrarisk.connectors.bq_cache import RegionStatsCache
+from terrarisk.services.analysis import join_region_stats
 
 
 def test_infer_bigquery_scalar_type_handles_common_values():
@@ -6,3 +18,119 @@ def test_infer_bigquery_scalar_type_handles_common_values():
     assert _infer_bigquery_scalar_type(42) == "INT64"
     assert _infer_bigquery_scalar_type(3.14) == "FLOAT64"
     assert _infer_bigquery_scalar_type("string") == "STRING"
+
+
+def test_client_is_reused_and_batches_region_stats():
+    built = []
+
+    def factory(project):
+        client = BigQueryStubClient(
+            project=project,
+            responses={"tiger.counties": [{"boundary_id": "22071", "mean": 0.4}]},
+        )
+        built.append(client)
+        return client
+
+    connector = BigQueryEarthEngineClient(project="local", dataset="dev", client_factory=factory)
+    requests = [
+        RegionStatsRequest(boundary_table="tiger.counties", boundary_key="geoid", raster_table=f"raster_{index}")
+        for index in range(5)
+    ]
+
+    results = connector.run_region_stats_many(requests, max_concurrency=3)
+    connector.run_sql("SELECT @value AS value", {"value": 1})
+
+    assert len(built) == 1
+    assert results == [[{"boundary_id": "22071", "mean": 0.4}]] * 5
+    assert [query for query in built[0].queries if "raster_" in query] == [request.render() for request in requests]
+
+
+def test_region_stats_cache_serves_repeats_and_tracks_table_versions(tmp_path):
+    stub = BigQueryStubClient(responses={"tiger.counties": [{"boundary_id": "22071", "mean": 0.4}]})
+    cache = RegionStatsCache(path=tmp_path / "region_stats.sqlite")
+    connector = BigQueryEarthEngineClient(
+        project="local", dataset="dev", client_factory=lambda project: stub, cache=cache
+    )
+    request = RegionStatsRequest(boundary_table="tiger.counties", boundary_key="geoid", raster_table="raster_a")
+
+    first = connector.run_region_stats_many([request])
+    second = connector.run_region_stats_many([request])
+    assert first == second == [[{"boundary_id": "22071", "mean": 0.4}]]
+    assert len(stub.queries) == 1
+
+    stub.table_etags["raster_a"] = "v1"
+    connector.run_region_stats_many([request])
+    assert len(stub.queries) == 2
+
+    assert cache.invalidate(table="raster_a") == 2
+    connector.run_region_stats_many([request])
+    assert len(stub.queries) == 3
+
+
+def test_single_region_stats_share_the_batch_cache(tmp_path):
+    stub = BigQueryStubClient(responses={"tiger.counties": [{"boundary_id": "22071", "mean": 0.4}]})
+    cache = RegionStatsCache(path=tmp_path / "region_stats.sqlite")
+    connector = BigQueryEarthEngineClient(
+        project="local", dataset="dev", client_factory=lambda project: stub, cache=cache
+    )
+    request = RegionStatsRequest(boundary_table="tiger.counties", boundary_key="geoid", raster_table="raster_a")
+
+    connector.run_region_stats_many([request])
+    job = connector.run_region_stats(boundary_table="tiger.counties", boundary_key="geoid", raster_table="raster_a")
+
+    assert len(stub.queries) == 1
+    assert list(job.result()) == [{"boundary_id": "22071", "mean": 0.4}]
+
+
+def test_region_stats_cache_round_trips_types_page_by_page(tmp_path):
+    cache = RegionStatsCache(path=tmp_path / "region_stats.sqlite")
+    pages = [
+        [{"boundary_id": "22071", "observed": datetime(2024, 6, 1, 12, 30, tzinfo=UTC), "mean": Decimal("0.125")}],
+        [{"boundary_id": "12086", "day": date(2024, 6, 2), "raw": b"\x00\xff", "stats": {"n": 3, "max": None}}],
+    ]
+
+    cache.put("key", iter(pages), ["raster_a"])
+    assert list(cache.iter_pages("key")) == pages
+    assert cache.get("key") == [row for page in pages for row in page]
+    assert cache.iter_pages("missing") is None
+
+    partial = cache.store_pages("key", iter(pages), ["raster_a"])
+    next(partial)
+    partial.close()
+    assert cache.get("key") is None
+
+
+def test_results_stream_in_pages_and_join_ranked_counties():
+    fips_codes = ["22071", "12086", "48201", "06037", "99999"]
+    rows = [{"boundary_id": fips, "mean": index / 10} for index, fips in enumerate(fips_codes)]
+    stub = BigQueryStubClient(responses={"tiger.counties": rows})
+    connector = BigQueryEarthEngineClient(project="local", dataset="dev", client_factory=lambda project: stub, page_size=2)
+    job = connector.run_region_stats(boundary_table="tiger.counties", boundary_key="geoid", raster_table="raster_a")
+
+    batches = list(connector.iter_dataframes(job))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    ranked = pd.DataFrame({"county_fips": ["12086", "22071", "01001"], "eal": [0.3, 0.5, 0.1]})
+    joined = join_region_stats(ranked, iter(batches))
+    assert joined["county_fips"].tolist() == ["12086", "22071", "01001"]
+    assert joined["region_mean"].tolist()[:2] == [0.1, 0.0]
+    assert pd.isna(joined["region_mean"].iloc[2])
+
+
+def test_cached_region_stats_stream_pages_from_sqlite(tmp_path):
+    rows = [{"boundary_id": fips, "mean": Decimal("0.5")} for fips in ("22071", "12086", "48201")]
+    stub = BigQueryStubClient(responses={"tiger.counties": rows})
+    connector = BigQueryEarthEngineClient(
+        project="local",
+        dataset="dev",
+        client_factory=lambda project: stub,
+        cache=RegionStatsCache(path=tmp_path / "region_stats.sqlite"),
+        page_size=2,
+    )
+    arguments = {"boundary_table": "tiger.counties", "boundary_key": "geoid", "raster_table": "raster_a"}
+
+    first = list(connector.iter_pages(connector.run_region_stats(**arguments)))
+    second = list(connector.iter_pages(connector.run_region_stats(**arguments)))
+
+    assert first == second == [rows[:2], rows[2:]]
+    assert len(stub.queries) == 1
@@ -0,0 +1,102 @@
+import json
+import math
+from pathlib import Path
+
+import pytest
+import shapely
+from shapely.geometry import shape
+
+from terrarisk.connectors.boundaries import BoundaryProvider, detail_for_zoom
+
+FIXTURE = Path(__file__).resolve().parent.parent / "terrarisk" / "examples" / "offline_counties.geojson"
+
+
+def test_boundary_provider_resolves_points_and_bboxes():
+    provider = BoundaryProvider(source_path=FIXTURE)
+
+    assert provider.locate(-90.07, 29.95) == "22071"
+    assert provider.locate(0.0, 0.0) is None
+
+    resolved = provider.locate_many([-80.19, -105.27, -40.0], [25.76, 40.01, 10.0])
+    assert resolved.tolist() == ["12086", "08013", ""]
+
+    assert provider.counties_in_bbox(-96.0, 29.0, -87.0, 31.5) == ["01097", "22071", "48201"]
+
+
+def test_county_feature_is_cached_and_falls_back_to_synthetic_point():
+    provider = BoundaryProvider(source_path=FIXTURE)
+
+    feature = provider.county_feature("06097")
+    assert feature["geometry"]["type"] == "Polygon"
+    assert feature["properties"] == {"county_fips": "06097", "name": "Sonoma County"}
+    assert provider.county_feature("06097") is feature
+
+    assert provider.county_feature("99999")["geometry"]["type"] == "Point"
+    assert BoundaryProvider().county_feature("22071")["properties"]["name"] == "Synthetic County"
+
+
+def test_unsupported_boundary_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        len(BoundaryProvider(source_path=tmp_path / "tl_us_county.shp"))
+
+
+def test_detail_levels_simplify_and_quantize(tmp_path):
+    ring = [
+        [round(-90.0 + 0.5 * math.cos(step * math.pi / 500), 9), round(30.0 + 0.5 * math.sin(step * math.pi / 500), 9)]
+        for step in range(1000)
+    ]
+    source = tmp_path / "counties.geojson"
+    source.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "properties": {"GEOID": "22071", "NAMELSAD": "Round Parish"},
+                        "geometry": {"type": "Polygon", "coordinates": [ring + [ring[0]]]},
+                    }
+                ],
+            }
+        )
+    )
+    provider = BoundaryProvider(source_path=source)
+
+    full = provider.county_feature("22071")
+    low = provider.county_feature("22071", detail_for_zoom(2))
+    assert len(low["geometry"]["coordinates"][0]) < len(full["geometry"]["coordinates"][0])
+    assert len(json.dumps(low)) < len(json.dumps(full)) / 10
+    assert all(round(value, 3) == value for coord in low["geometry"]["coordinates"][0] for value in coord)
+    assert provider.county_feature("22071", "low") is low
+
+    assert detail_for_zoom(None).name == "full"
+    assert detail_for_zoom(12).name == "full"
+    assert detail_for_zoom(5).name == "medium"
+
+
+def test_simplified_neighbours_keep_a_shared_border(tmp_path):
+    border = [[round(0.03 * math.sin(step * 0.37) + 0.01 * math.cos(step * 1.3), 9), step / 100] for step in range(101)]
+    west = [[-1.0, 0.0], *border, [-1.0, 1.0], [-1.0, 0.0]]
+    east = [[1.0, 0.5], [1.0, 0.0], *border, [1.0, 1.0], [1.0, 0.5]]
+    source = tmp_path / "counties.geojson"
+    source.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "properties": {"GEOID": fips, "NAMELSAD": fips},
+                        "geometry": {"type": "Polygon", "coordinates": [ring]},
+                    }
+                    for fips, ring in (("01001", west), ("01003", east))
+                ],
+            }
+        )
+    )
+    provider = BoundaryProvider(source_path=source)
+
+    for level in ("high", "medium", "low"):
+        west_shape, east_shape = (shape(provider.county_feature(fips, level)["geometry"]) for fips in ("01001", "01003"))
+        assert shapely.intersection(west_shape, east_shape).area == 0
+        assert shapely.union_all([west_shape, east_shape]).area == pytest.approx(2.0)
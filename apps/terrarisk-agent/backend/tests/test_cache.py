@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+
+from terrarisk import config
+from terrarisk.main import app
+from terrarisk.models.domain import AnalysisRequest, HazardType
+from terrarisk.services.analysis import run_analysis
+from terrarisk.services.cache import ResultCache, get_result_cache, request_fingerprint
+
+
+def test_request_fingerprint_is_order_insensitive_and_versioned():
+    first = AnalysisRequest(query="q", hazards=[HazardType.FLOOD, HazardType.HURRICANE], geography_filter=["48201", "22071"])
+    second = AnalysisRequest(query="q", hazards=[HazardType.HURRICANE, HazardType.FLOOD], geography_filter=["22071", "48201"])
+
+    assert request_fingerprint(first, "v1") == request_fingerprint(second, "v1")
+    assert request_fingerprint(first, "v1") != request_fingerprint(first, "v2")
+    assert request_fingerprint(first, "v1") != request_fingerprint(AnalysisRequest(query="q2"), "v1")
+
+
+def test_result_cache_lru_and_disk_tier(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    config.get_settings.cache_clear()
+    response = run_analysis(AnalysisRequest(query="Cache me"))
+
+    cache = ResultCache(max_entries=1, disk_dir=tmp_path / "cache")
+    cache.put("a", response)
+    cache.put("b", response)
+    assert cache.get("a") is None
+    assert cache.get("b") is response
+    assert cache.get_from_disk("a").run_id == response.run_id
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["evictions"] == 2
+
+    ResultCache(ttl_seconds=0.0001, disk_dir=tmp_path / "stale").put("c", response)
+    assert ResultCache(ttl_seconds=0.0001, disk_dir=tmp_path / "stale").get_from_disk("c") is None
+    config.get_settings.cache_clear()
+
+
+def test_report_reuses_analyze_result(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path))
+    config.get_settings.cache_clear()
+    get_result_cache.cache_clear()
+
+    client = TestClient(app)
+    payload = {"query": "Analyze then report", "mode": "offline", "hazards": ["flood"]}
+
+    analyzed = client.post("/analyze", json=payload).json()
+    reported = client.post("/report", json=payload).json()
+    assert reported["run_id"] == analyzed["run_id"]
+    assert reported["action_credentials"] == analyzed["action_credentials"]
+
+    stats = client.get("/metrics").json()["result_cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    get_result_cache.cache_clear()
+    config.get_settings.cache_clear()
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from terrarisk.main import app
+from terrarisk.services.concurrency import (
+    BoundedExecutor,
+    CapacityExceededError,
+    get_analysis_executor,
+)
+
+
+def test_bounded_executor_rejects_work_beyond_capacity():
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert executor.in_flight == 2
+        with pytest.raises(CapacityExceededError):
+            await executor.run(release.wait)
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(scenario()) == [True, True]
+    assert executor.in_flight == 0
+    executor.shutdown()
+
+
+def test_cancelled_request_holds_its_slot_until_the_job_finishes():
+    executor = BoundedExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        request = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        assert executor.in_flight == 1
+        with pytest.raises(CapacityExceededError):
+            await executor.run(release.wait)
+
+    asyncio.run(scenario())
+    release.set()
+    executor.shutdown()
+    assert executor.in_flight == 0
+
+
+def test_analyze_returns_429_when_saturated():
+    class SaturatedExecutor(BoundedExecutor):
+        async def run(self, func, *args, **kwargs):
+            raise CapacityExceededError("saturated")
+
+    saturated = SaturatedExecutor(max_workers=1, max_queue=0)
+    app.dependency_overrides[get_analysis_executor] = lambda: saturated
+    try:
+        response = TestClient(app).post("/analyze", json={"query": "Hurricane risk", "mode": "offline"})
+    finally:
+        app.dependency_overrides.clear()
+        saturated.shutdown()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
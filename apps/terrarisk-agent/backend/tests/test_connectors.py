@@ -1,4 +1,13 @@
-from terrarisk.connectors.earth_ai import EarthAIStubClient
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from terrarisk.connectors.datacommons import DataCommonsClient
+from terrarisk.connectors.earth_ai import CachedEarthAIClient, EarthAIStubClient
 
 
 def test_earth_ai_stub_plan_and_run_cycle():
@@ -12,3 +21,67 @@ def test_earth_ai_stub_plan_and_run_cycle():
     output = client.run(steps[0])
     assert output["step_id"] == steps[0].id
     assert output["synthetic"] is True
+
+
+def test_datacommons_batches_retries_and_caches_population(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(503)
+        places = json.loads(request.content)["places"]
+        data = {place: {"Count_Person": {"val": {"2021": 100, "2022": int(place[-4:])}}} for place in places}
+        return httpx.Response(200, json={"data": data})
+
+    places = [f"geoId/{index:05d}" for index in range(1, 1201)]
+    client = DataCommonsClient(transport=httpx.MockTransport(handler), batch_size=500, cache_dir=tmp_path)
+
+    populations = client.latest_population(places)
+    assert len(requests) == 4  # one retried 503 plus three batches of <= 500 places
+    assert populations["geoId/01200"] == 1200.0
+    assert client.latest_population(places[:10]) == {place: float(place[-4:]) for place in places[:10]}
+    assert len(requests) == 4
+
+    restarted = DataCommonsClient(transport=httpx.MockTransport(handler), cache_dir=tmp_path)
+    assert restarted.latest_population(["geoId/00042"]) == {"geoId/00042": 42.0}
+    assert len(requests) == 4
+
+
+def test_datacommons_keeps_one_pooled_client_across_caller_loops():
+    def handler(request: httpx.Request) -> httpx.Response:
+        places = json.loads(request.content)["places"]
+        return httpx.Response(200, json={"data": {place: {"Count_Person": {"val": {"2022": 7}}} for place in places}})
+
+    client = DataCommonsClient(transport=httpx.MockTransport(handler), cache_size=0)
+    asyncio.run(client.fetch_population("geoId/00001"))
+    pooled = client._client
+    asyncio.run(client.fetch_population("geoId/00002"))
+    assert client._client is pooled is not None
+
+    client.close()
+    assert client._client is None and pooled.is_closed
+    assert client.latest_population(["geoId/00003"]) == {"geoId/00003": 7.0}
+    client.close()
+
+
+def test_cached_earth_ai_client_coalesces_identical_plans():
+    release = threading.Event()
+
+    class SlowPlanner(EarthAIStubClient):
+        def plan(self, query):
+            release.wait(timeout=5)
+            return super().plan(query)
+
+    client = CachedEarthAIClient(client=SlowPlanner())
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(client.plan, query) for query in ["Gulf  hurricanes", "gulf hurricanes"] * 2]
+        time.sleep(0.1)
+        release.set()
+        plans = [future.result() for future in futures]
+
+    assert client.upstream_calls == 1
+    assert all([step.id for step in plan] == ["earth-ai-1", "earth-ai-2"] for plan in plans)
+    plans[0][0].parameters["mode"] = "mutated"
+    assert client.plan("GULF HURRICANES")[0].parameters["mode"] == "analysis"
+    assert client.upstream_calls == 1
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from terrarisk.agents.executor import PlanExecutor, build_dependency_graph, execute_plan
+from terrarisk.models.domain import PlannerStep
+
+
+def _step(step_id, source, inputs=()):
+    return PlannerStep(id=step_id, description=step_id, source=source, inputs=list(inputs))
+
+
+def test_execute_plan_overlaps_independent_steps_and_passes_outputs():
+    steps = [
+        _step("a", "slow", ["free-text input"]),
+        _step("b", "slow"),
+        _step("c", "join", ["a", "b"]),
+    ]
+
+    spans = {}
+    both_running = threading.Barrier(2, timeout=5)
+
+    def slow(step, upstream):
+        started = time.perf_counter()
+        both_running.wait()
+        spans[step.id] = (started, time.perf_counter())
+        return step.id
+
+    async def join(step, upstream):
+        return sorted(upstream.values())
+
+    run = execute_plan(steps, {"slow": slow, "join": join})
+
+    (a_start, a_end), (b_start, b_end) = spans["a"], spans["b"]
+    assert a_start < b_end and b_start < a_end, "Independent steps should run concurrently"
+    assert run.output("c") == ["a", "b"]
+    assert [execution.status for execution in run.executions] == ["succeeded"] * 3
+    assert all(execution.duration_ms is not None for execution in run.executions)
+
+
+def test_failed_step_skips_dependents():
+    steps = [_step("a", "boom"), _step("b", "ok", ["a"]), _step("c", "ok")]
+
+    def boom(step, upstream):
+        raise RuntimeError("upstream unavailable")
+
+    run = execute_plan(steps, {"boom": boom, "ok": lambda step, upstream: step.id})
+
+    assert [execution.status for execution in run.executions] == ["failed", "skipped", "succeeded"]
+    assert run.executions[1].error == "Upstream step a failed."
+    with pytest.raises(RuntimeError, match="upstream unavailable"):
+        run.output("b")
+
+
+def test_dependency_cycles_are_rejected():
+    steps = [_step("a", "ok", ["b"]), _step("b", "ok", ["a"])]
+    assert build_dependency_graph(steps) == {"a": {"b"}, "b": {"a"}}
+    with pytest.raises(ValueError):
+        asyncio.run(PlanExecutor({"ok": lambda step, upstream: None}).run(steps))
+
+
+def test_execute_plan_reuses_one_loop_per_thread():
+    loops = []
+
+    async def record(step, upstream):
+        loops.append(asyncio.get_running_loop())
+
+    for _ in range(2):
+        execute_plan([_step("a", "record")], {"record": record})
+
+    assert loops[0] is loops[1]
+    assert not loops[0].is_closed()
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import numpy as np
+
+from terrarisk.connectors.nri import (
+    NRILoader,
+    NRIStore,
+    compile_snapshot,
+    get_nri_store,
+)
+
+FIXTURE = Path(__file__).resolve().parent.parent / "terrarisk" / "examples" / "offline_nri.csv"
+
+
+def test_nri_store_ranks_hazards_by_eal():
+    store = NRIStore.from_loader(NRILoader(source_path=FIXTURE))
+
+    ranked = store.records(store.rank(["hurricane"]))
+    assert [row["county_fips"] for row in ranked] == ["22071", "12086", "01097"]
+
+    mixed = store.rank(["flood", "wildfire"])
+    eal = store.columns["eal"][mixed]
+    assert np.all(eal[:-1] >= eal[1:])
+    assert set(store.columns["hazard_type"][mixed]) == {"flood", "wildfire"}
+
+    assert store.rank(["tornado"]).size == 0
+    assert store.records(store.rows_for_counties(["06097"]))[0]["county"] == "Sonoma County"
+
+
+def test_get_nri_store_is_shared_across_calls():
+    assert get_nri_store() is get_nri_store()
+    assert len(get_nri_store()) == 7
+
+
+def test_compiled_snapshot_opens_memory_mapped(tmp_path):
+    snapshot = compile_snapshot(FIXTURE, tmp_path / "nri.snapshot")
+
+    store = NRIStore.from_loader(NRILoader(source_path=snapshot))
+    assert isinstance(store.columns["eal"], np.memmap)
+    assert store.version == NRIStore.from_loader(NRILoader(source_path=FIXTURE)).version
+    assert store.records(store.rank(["hurricane"]))[0]["county_fips"] == "22071"
+
+    frame = NRILoader(source_path=snapshot).load()
+    assert list(frame.columns) == ["state", "county", "county_fips", "hazard_type", "eal", "population", "resilience_index"]
+    assert frame.loc[frame["county"] == "Sonoma County", "county_fips"].item() == "06097"
+
+
+def test_recompiling_swaps_the_snapshot_link(tmp_path):
+    snapshot = compile_snapshot(FIXTURE, tmp_path / "nri.snapshot")
+    first = NRIStore.from_loader(NRILoader(source_path=snapshot))
+    assert isinstance(first.indexes["eal_order"], np.memmap)
+    compiled = snapshot.resolve()
+
+    compile_snapshot(FIXTURE, snapshot)
+
+    assert snapshot.is_symlink() and snapshot.resolve() != compiled
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(["nri.snapshot", snapshot.resolve().name])
+    assert first.records(first.rank(["hurricane"]))[0]["county_fips"] == "22071"
+
+
+def test_hazards_for_counties_batches_lookups():
+    loader = NRILoader(source_path=FIXTURE)
+
+    frame = loader.hazards_for_counties(["12086", "6097", "99999", "22071"])
+    assert frame["county_fips"].tolist() == ["12086", "06097", "22071"]
+    assert loader.store() is loader.store()
+
+    single = loader.hazards_for_county("48201")
+    assert single["hazard_type"].tolist() == ["flood"]
+    assert loader.hazards_for_counties([]).empty
+
+
+def test_load_pushes_down_predicates(tmp_path):
+    loader = NRILoader(source_path=FIXTURE)
+
+    frame = loader.load(hazards=["HURRICANE"], states=["fl", "LA"], chunksize=2)
+    assert sorted(frame["county_fips"]) == ["12086", "22071"]
+    assert "eal" in frame.columns
+
+    pruned = loader.load(["county", "expected_annual_loss"], county_fips=["6097"])
+    assert list(pruned.columns) == ["county", "eal"]
+    assert pruned["county"].tolist() == ["Sonoma County"]
+
+    snapshot = compile_snapshot(FIXTURE, tmp_path / "nri.snapshot")
+    from_snapshot = NRILoader(source_path=snapshot).load(hazards=["wildfire"], states=["CO"])
+    assert from_snapshot["county_fips"].tolist() == ["08013"]
+
+    assert loader.load(hazards=["tornado"]).empty
+
+
+def test_store_select_applies_geography():
+    store = NRIStore.from_loader(NRILoader(source_path=FIXTURE))
+    rows = store.select(["hurricane"], states=["AL", "FL"])
+    assert store.columns["county_fips"][rows].tolist() == ["12086", "01097"]
+    assert store.select(["hurricane"], county_fips=["48201"]).size == 0
+
+
+def test_store_select_pages_through_ranking():
+    store = NRIStore.from_loader(NRILoader(source_path=FIXTURE))
+    hazards = ["hurricane", "wildfire", "flood"]
+
+    full = store.select(hazards)
+    assert store.select(hazards, limit=3).tolist() == full[:3].tolist()
+    assert store.select(hazards, limit=2, offset=2).tolist() == full[2:4].tolist()
+    assert store.select(hazards, states=["LA", "CO", "NC"], limit=1, offset=1).tolist() == [4]
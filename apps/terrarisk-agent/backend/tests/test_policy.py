@@ -0,0 +1,121 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from terrarisk import config
+from terrarisk.agents.executor import execute_plan
+from terrarisk.main import app
+from terrarisk.models.domain import PlannerStep
+from terrarisk.utils.paths import resolve_repo_path
+from terrarisk.utils.policy import PolicyEngine, PolicyRequest, get_policy_engine
+
+
+def _engine(tmp_path, source=None):
+    bundle = tmp_path / "policy.rego"
+    bundle.write_text(source or resolve_repo_path("packages/policies/opa_bundle/policy.rego").read_text())
+    return PolicyEngine(path=bundle, reload_interval=0.0)
+
+
+def test_shipped_bundle_decisions(tmp_path):
+    engine = _engine(tmp_path)
+
+    assert engine.decide(PolicyRequest(action="nri.load", mode="offline")).allowed
+    assert not engine.decide(PolicyRequest(action="nri.load", mode="cloud")).allowed
+    assert not engine.decide(PolicyRequest(action="bigquery.region_stats", mode="cloud")).allowed
+    assert engine.decide(PolicyRequest(action="bigquery.region_stats", mode="cloud", role="admin")).allowed
+    assert not engine.decide(PolicyRequest(action="earth_ai.run", mode="offline")).allowed
+
+    earth_ai = engine.decide(PolicyRequest(action="earth_ai.run", mode="cloud", role="admin"))
+    assert earth_ai.reasons == ("earth_ai access disabled",)
+    flagged = PolicyRequest(action="earth_ai.run", mode="cloud", role="admin", flags=frozenset({"earth_ai_enabled"}))
+    assert engine.decide(flagged).allowed
+
+    over_budget = PolicyRequest(action="nri.load", mode="offline", estimated_cost=5.0, remaining_budget=1.0)
+    assert engine.decide(over_budget).reasons == ("insufficient budget for nri.load",)
+    assert not engine.decide(PolicyRequest(action="nri.load", mode="offline", geo_precision="address")).allowed
+
+
+def test_deny_without_message_uses_default_reason(tmp_path):
+    engine = _engine(
+        tmp_path,
+        'package terrarisk.authz\n\ndefault allow := true\n\ndeny {\n  input.request.mode == "cloud"\n}\n',
+    )
+
+    assert engine.decide(PolicyRequest(action="nri.load", mode="offline")).allowed
+    decision = engine.decide(PolicyRequest(action="nri.load", mode="cloud"))
+    assert not decision.allowed
+    assert decision.reasons == ("denied by policy",)
+
+
+def test_decisions_are_memoized_until_the_bundle_changes(tmp_path):
+    engine = _engine(tmp_path)
+    request = PolicyRequest(action="portfolio.offline_demo", mode="offline")
+    assert engine.decide(request) is engine.decide(request)
+
+    engine.path.write_text(engine.path.read_text().replace('"portfolio.offline_demo"', '"portfolio.other"'))
+    stat = engine.path.stat()
+    os.utime(engine.path, (stat.st_atime, stat.st_mtime + 5))
+    assert not engine.decide(request).allowed
+
+
+def test_executor_guard_denies_steps_and_skips_dependents():
+    steps = [
+        PlannerStep(id="a", description="a", source="ok"),
+        PlannerStep(id="b", description="b", source="blocked", inputs=["a"]),
+        PlannerStep(id="c", description="c", source="ok", inputs=["b"]),
+    ]
+    handlers = {"ok": lambda step, upstream: step.id, "blocked": lambda step, upstream: step.id}
+
+    run = execute_plan(steps, handlers, guard=lambda step: "nope" if step.source == "blocked" else None)
+
+    assert [execution.status for execution in run.executions] == ["succeeded", "denied", "skipped"]
+
+
+@pytest.fixture
+def policy_settings(monkeypatch):
+    def apply(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        config.get_settings.cache_clear()
+        get_policy_engine.cache_clear()
+
+    yield apply
+    config.get_settings.cache_clear()
+    get_policy_engine.cache_clear()
+
+
+def test_enforced_by_default_and_cloud_analysis_needs_admin(policy_settings):
+    client = TestClient(app)
+    payload = {"query": "Gulf hurricanes", "mode": "cloud"}
+    policy_settings()
+
+    offline = client.post("/analyze", json={**payload, "mode": "offline"})
+    assert offline.status_code == 200
+    assert {execution["status"] for execution in offline.json()["executions"]} == {"succeeded"}
+    response = client.post("/analyze", json=payload)
+    assert response.status_code == 403
+    assert "no allow rule matched" in response.json()["detail"]
+
+    policy_settings(POLICY_ACTOR_ROLE="admin")
+    response = client.post("/analyze", json={**payload, "mode": "byo_bigquery"})
+    assert response.status_code == 200
+    assert {execution["status"] for execution in response.json()["executions"]} == {"succeeded"}
+
+
+def test_warn_mode_response_is_not_served_after_enforcement(policy_settings):
+    client = TestClient(app)
+    payload = {"query": "Gulf hurricanes", "mode": "cloud", "top_k": 3}
+    policy_settings(POLICY_ENFORCEMENT="warn", POLICY_ACTOR_ROLE="system")
+    assert client.post("/analyze", json=payload).status_code == 200
+
+    policy_settings(POLICY_ENFORCEMENT="enforce")
+
+    assert client.post("/analyze", json=payload).status_code == 403
+
+
+def test_missing_bundle_stops_startup(policy_settings):
+    policy_settings(POLICY_BUNDLE_PATH="/nonexistent/policy.rego")
+
+    with pytest.raises(FileNotFoundError, match="POLICY_BUNDLE_PATH"), TestClient(app):
+        pass
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from terrarisk.connectors.boundaries import BoundaryProvider
+from terrarisk.connectors.nri import NRILoader
+from terrarisk.main import app
+from terrarisk.services.portfolio import (
+    aggregate_exposure,
+    geocode_portfolio,
+    read_portfolio,
+)
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "terrarisk" / "examples"
+
+PORTFOLIO_CSV = b"""Lat,Lon,TIV
+29.95,-90.07,2000000
+29.96,-90.05,1000000
+25.76,-80.19,500000
+10.0,-40.0,750000
+"""
+
+
+def test_portfolio_join_aggregates_exposure_per_hazard():
+    portfolio = read_portfolio(PORTFOLIO_CSV, "text/csv")
+    located = geocode_portfolio(portfolio, BoundaryProvider(source_path=EXAMPLES / "offline_counties.geojson"))
+    assert located["county_fips"].tolist() == ["22071", "22071", "12086", ""]
+
+    store = NRILoader(source_path=EXAMPLES / "offline_nri.csv").store()
+    exposure = aggregate_exposure(located, store).set_index("hazard_type")
+    assert exposure.loc["hurricane", "exposed_tiv"] == 3_500_000
+    assert exposure.loc["hurricane", "counties"] == 2
+    assert exposure.loc["hurricane", "expected_annual_loss"] == pytest.approx(3_000_000 * 0.92 + 500_000 * 0.81)
+
+
+def test_read_portfolio_rejects_missing_columns():
+    with pytest.raises(ValueError):
+        read_portfolio(b"lat,lon\n1,2\n")
+
+
+def test_portfolio_stress_endpoint_accepts_csv_upload():
+    client = TestClient(app)
+
+    response = client.post(
+        "/portfolio/stress?portfolio_id=gulf",
+        content=PORTFOLIO_CSV,
+        headers={"content-type": "text/csv"},
+    )
+    assert response.status_code == 200
+    metrics = response.json()["metrics"]
+    assert metrics["unmatched_locations"] == 1
+    assert metrics["hazards"]["hurricane"]["locations"] == 3
+
+    demo = client.post("/portfolio/stress?portfolio_id=demo").json()["metrics"]
+    assert demo["geocoded_locations"] == demo["locations"] == 7
+
+    bad = client.post("/portfolio/stress?portfolio_id=bad", content=b"x,y\n1,2\n")
+    assert bad.status_code == 400
+
+
+def test_portfolio_stress_reports_seeded_pml_and_tvar():
+    client = TestClient(app)
+    url = "/portfolio/stress?portfolio_id=gulf&simulations=2000&seed=11&return_periods=100&return_periods=250"
+
+    first = client.post(url, content=PORTFOLIO_CSV, headers={"content-type": "text/csv"}).json()["metrics"]
+    second = client.post(url, content=PORTFOLIO_CSV, headers={"content-type": "text/csv"}).json()["metrics"]
+
+    assert first["pml"] == second["pml"]
+    assert set(first["pml"]) == {"100", "250"}
+    assert first["tail_value_at_risk"]["value"] >= first["value_at_risk"]["value"]
+    assert first["simulations"] == 2000
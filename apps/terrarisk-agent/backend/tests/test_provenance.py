@@ -0,0 +1,119 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from terrarisk import config
+from terrarisk.main import app
+from terrarisk.models.domain import AnalysisMode, AnalysisRequest, AnalysisResponse
+from terrarisk.services.analysis import run_analysis
+from terrarisk.utils.merkle import MerkleTree, verify_proof
+from terrarisk.utils.provenance import (
+    CredentialSpec,
+    CredentialValidationError,
+    CredentialValidator,
+    build_action_credentials,
+    get_credential_validator,
+    load_schema,
+    manifest_proof,
+    verify_run_manifest,
+)
+from terrarisk.utils.signing import (
+    LocalKeySigner,
+    SigningPipeline,
+    verify_manifest_signatures,
+)
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 8])
+def test_merkle_proofs_verify_every_leaf(count):
+    leaves = [f"leaf-{index}".encode() for index in range(count)]
+    tree = MerkleTree(leaves)
+
+    for index, leaf in enumerate(leaves):
+        assert verify_proof(leaf, tree.proof(index), tree.root)
+    assert not verify_proof(b"forged", tree.proof(0), tree.root)
+    assert MerkleTree(leaves + [leaves[-1]]).root != tree.root
+
+
+def test_batch_credentials_share_timestamp_with_distinct_ids():
+    credentials = build_action_credentials(
+        CredentialSpec(action_type="planner.step.nri_loader", inputs=[], outputs=[f"step-{index}"], source="nri_loader")
+        for index in range(3)
+    )
+
+    assert len({credential.id for credential in credentials}) == 3
+    assert len({credential.timestamp for credential in credentials}) == 1
+
+
+def test_run_manifest_roots_artifacts_and_credentials():
+    response = run_analysis(AnalysisRequest(query="Gulf hurricanes", mode=AnalysisMode.OFFLINE))
+    manifest = response.manifest
+
+    assert manifest is not None
+    assert len(manifest.leaves) == len(response.artifacts) + len(response.action_credentials)
+    roundtrip = AnalysisResponse.model_validate_json(response.model_dump_json())
+    assert verify_run_manifest(manifest, roundtrip.artifacts, roundtrip.action_credentials)
+
+    leaf, proof = manifest_proof(manifest, response.artifacts[0].uri)
+    assert verify_proof(leaf, proof, manifest.merkle_root)
+
+    tampered = [artifact.model_copy(update={"hash": "0" * 64}) for artifact in response.artifacts]
+    assert not verify_run_manifest(manifest, tampered, response.action_credentials)
+
+
+def test_credentials_conform_to_compiled_schema():
+    validator = get_credential_validator()
+    response = run_analysis(AnalysisRequest(query="Gulf floods", mode=AnalysisMode.OFFLINE))
+
+    assert validator.errors(response.action_credentials) == []
+
+    broken = response.action_credentials[0].model_copy(update={"actor": {"name": "anonymous"}})
+    with pytest.raises(CredentialValidationError) as excinfo:
+        validator.validate([broken])
+    assert any("identity" in error for error in excinfo.value.errors)
+
+
+def test_async_validation_reports_violations_off_the_calling_thread():
+    credential = build_action_credentials(
+        [CredentialSpec(action_type="report.compose", inputs=[], outputs=[], source="reports.compose", mode="nearline")]
+    )[0]
+    validator = CredentialValidator(schema=load_schema(), mode="async")
+
+    errors = validator.submit([credential]).result(timeout=5)
+
+    assert errors and "nearline" in errors[0]
+    assert validator.stats() == {"mode": "async", "validated": 1, "failed": 1}
+
+
+def test_signing_pipeline_signs_one_manifest_per_run(tmp_path):
+    signer = LocalKeySigner.from_path(tmp_path / "signing.pem")
+    assert LocalKeySigner.from_path(tmp_path / "signing.pem").key_id == signer.key_id
+    pipeline = SigningPipeline(signer=signer)
+    response = run_analysis(AnalysisRequest(query="Gulf hurricanes", mode=AnalysisMode.OFFLINE))
+
+    unsigned = response.manifest.model_copy(update={"signatures": []})
+    manifest, credentials = pipeline.sign_run(unsigned, response.action_credentials)
+
+    assert pipeline.verify(manifest)
+    assert verify_run_manifest(manifest, response.artifacts, credentials)
+    assert credentials[0].signatures[-1]["verification_method"] == f"local-ed25519:{signer.key_id}"
+    get_credential_validator().validate(credentials)
+    forged = manifest.model_copy(update={"merkle_root": "0" * 64})
+    assert not pipeline.verify(forged)
+    # Verifiable from the embedded public key alone, e.g. after the signing process restarted.
+    assert verify_manifest_signatures(manifest, trusted_key_ids=[signer.key_id])
+    assert not verify_manifest_signatures(manifest, trusted_key_ids=["someone-else"])
+    assert not verify_manifest_signatures(forged)
+    assert manifest.signatures[0]["type"] == "local_ed25519"
+
+
+def test_missing_schema_stops_startup(monkeypatch):
+    monkeypatch.setenv("ACTION_CREDENTIAL_SCHEMA_PATH", "/nonexistent/action_credential.json")
+    caches = (config.get_settings, load_schema, get_credential_validator)
+    for cached in caches:
+        cached.cache_clear()
+    try:
+        with pytest.raises(FileNotFoundError, match="ACTION_CREDENTIAL_SCHEMA_PATH"), TestClient(app):
+            pass
+    finally:
+        for cached in caches:
+            cached.cache_clear()
@@ -1,8 +1,11 @@
+import hashlib
+import json
 from pathlib import Path
 
 from terrarisk import config
-from terrarisk.models.domain import AnalysisMode, AnalysisRequest
+from terrarisk.models.domain import AnalysisMode, AnalysisRequest, LayerFormat
 from terrarisk.reports.compose import build_report_bundle
+from terrarisk.reports.geojson import RECORD_SEPARATOR, iter_feature_collection
 
 
 def test_build_report_bundle_respects_artifact_dir(tmp_path, monkeypatch):
@@ -25,6 +28,38 @@ def test_build_report_bundle_respects_artifact_dir(tmp_path, monkeypatch):
         path = Path(artifact.uri)
         assert path.exists()
         assert str(path).startswith(str(tmp_path))
+        data = path.read_bytes()
+        assert artifact.hash == hashlib.sha256(data).hexdigest()
+        assert artifact.metadata["size_bytes"] == len(data)
 
     assert credentials, "Expected an action credential for the report step"
     config.get_settings.cache_clear()
+
+
+def test_geojson_layers_stream_from_generators(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path))
+    config.get_settings.cache_clear()
+
+    def features():
+        for index in range(3):
+            yield {"type": "Feature", "geometry": None, "properties": {"index": index}}
+
+    collection = json.loads("".join(iter_feature_collection(features())))
+    assert [item["properties"]["index"] for item in collection["features"]] == [0, 1, 2]
+    assert json.loads("".join(iter_feature_collection([]))) == {"type": "FeatureCollection", "features": []}
+
+    request = AnalysisRequest(query="Seq layers", layer_format=LayerFormat.GEOJSON_SEQ)
+    artifacts, _ = build_report_bundle(
+        request,
+        run_id="seq-test",
+        highlights=[],
+        sources=[],
+        features=features(),
+        portfolio_rows=[],
+    )
+
+    layer = next(artifact for artifact in artifacts if artifact.type == "application/geo+json-seq")
+    records = Path(layer.uri).read_text().split("\n")[:-1]
+    assert all(record.startswith(RECORD_SEPARATOR) for record in records)
+    assert [json.loads(record[1:])["properties"]["index"] for record in records] == [0, 1, 2]
+    config.get_settings.cache_clear()
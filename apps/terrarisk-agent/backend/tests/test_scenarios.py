@@ -1,8 +1,14 @@
+from pathlib import Path
+
+from terrarisk.connectors.nri import NRILoader
 from terrarisk.main import app
 from terrarisk.models.domain import HazardType
+from terrarisk.services.scenarios import ScenarioEngine
 
 from fastapi.testclient import TestClient
 
+FIXTURE = Path(__file__).resolve().parent.parent / "terrarisk" / "examples" / "offline_nri.csv"
+
 
 def test_scenario_endpoint_covers_all_hazards():
     client = TestClient(app)
@@ -12,3 +18,51 @@ def test_scenario_endpoint_covers_all_hazards():
         payload = response.json()
         assert payload["scenario"] == hazard.value
         assert payload["recommended_actions"], "Expected recommended actions for each hazard"
+
+
+def test_scenario_engine_computes_and_memoizes_metrics():
+    store = NRILoader(source_path=FIXTURE).store()
+    calls = []
+
+    def population(fips):
+        calls.append(list(fips))
+        return {code: 1000.0 for code in fips}
+
+    engine = ScenarioEngine(store=store, population_fetcher=population)
+
+    hurricane = engine.scenario(HazardType.HURRICANE)
+    assert hurricane.metrics["county_count"] == 3
+    assert hurricane.metrics["exposed_population"] == 3000
+    assert hurricane.metrics["top_county"] == "Orleans Parish (22071)"
+    assert hurricane.metrics["risk_score"] == round((0.92 + 0.81 + 0.56) / 3, 4)
+
+    assert engine.scenario(HazardType.HURRICANE) is hurricane
+    assert len(calls) == 1
+
+    florida = engine.scenario(HazardType.HURRICANE, ["FL", "LA"])
+    assert florida.metrics["county_count"] == 2
+    assert engine.scenario(HazardType.HURRICANE, [" la", "fl", "FL"]) is florida
+    assert engine.scenario(HazardType.WILDFIRE, ["LA"]).metrics["county_count"] == 0
+
+
+def test_scenario_endpoint_filters_by_geography():
+    client = TestClient(app)
+    payload = client.get("/scenarios/wildfire", params={"geography": ["CO"]}).json()
+    assert payload["metrics"]["top_county"] == "Boulder County (08013)"
+    assert client.get("/scenarios/wildfire", params={"geography": ["Colorado"]}).status_code == 400
+
+
+def test_scenario_precompute_skips_population_fetcher():
+    store = NRILoader(source_path=FIXTURE).store()
+    calls = []
+
+    def population(fips):
+        calls.append(list(fips))
+        return {code: 1000.0 for code in fips}
+
+    engine = ScenarioEngine(store=store, population_fetcher=population)
+    engine.precompute()
+    assert calls == []
+
+    assert engine.scenario(HazardType.FLOOD).metrics["population_source"] == "Data Commons Count_Person"
+    assert len(calls) == 1
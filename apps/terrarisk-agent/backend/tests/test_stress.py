@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from terrarisk.services.stress import (
+    StressCells,
+    build_stress_cells,
+    loss_metrics,
+    simulate_annual_losses,
+)
+
+CELLS = StressCells(
+    tiv=np.array([2_000_000.0, 500_000.0, 1_000_000.0]),
+    eal=np.array([0.01, 0.005, 0.02]),
+    frequency=np.array([0.25, 0.6, 0.15]),
+)
+
+
+def test_seeded_simulation_is_reproducible_across_chunkings():
+    whole = simulate_annual_losses(CELLS, years=5_000, seed=7, chunk_size=5_000)
+    assert np.array_equal(whole, simulate_annual_losses(CELLS, years=5_000, seed=7, chunk_size=5_000))
+
+    chunked = simulate_annual_losses(CELLS, years=5_000, seed=7, chunk_size=1_000)
+    assert chunked.shape == (5_000,)
+    assert np.array_equal(chunked, simulate_annual_losses(CELLS, years=5_000, seed=7, chunk_size=1_000))
+
+
+def test_simulated_mean_tracks_expected_annual_loss():
+    losses = simulate_annual_losses(CELLS, years=200_000, seed=1, chunk_size=50_000)
+    expected = float(CELLS.tiv @ CELLS.eal)
+    assert losses.mean() == pytest.approx(expected, rel=0.05)
+
+
+def test_parallel_chunks_match_serial_chunks():
+    serial = simulate_annual_losses(CELLS, years=4_000, seed=3, chunk_size=1_000)
+    parallel = simulate_annual_losses(CELLS, years=4_000, seed=3, chunk_size=1_000, max_workers=2)
+    assert np.array_equal(serial, parallel)
+
+
+def test_loss_metrics_orders_pml_and_tvar():
+    losses = np.arange(1, 1001, dtype=float)
+    metrics = loss_metrics(losses, return_periods=[100, 10], tvar_level=0.9)
+
+    assert list(metrics["pml"]) == ["10", "100"]
+    assert metrics["pml"]["10"] < metrics["pml"]["100"]
+    assert metrics["tail_value_at_risk"]["value"] >= metrics["value_at_risk"]["value"]
+    with pytest.raises(ValueError):
+        loss_metrics(losses, return_periods=[1])
+
+
+def test_build_stress_cells_joins_exposure_to_nri():
+    located = pd.DataFrame({"county_fips": ["22071", "22071", ""], "tiv": [1.0, 2.0, 5.0]})
+    nri = pd.DataFrame({"county_fips": ["22071"], "hazard_type": ["hurricane"], "eal": [0.9]})
+
+    cells = build_stress_cells(located, nri, frequencies={"hurricane": 0.5})
+    assert cells.tiv.tolist() == [3.0]
+    assert cells.frequency.tolist() == [0.5]
@@ -0,0 +1,38 @@
+from opentelemetry import trace
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from terrarisk.connectors.nri import NRILoader, NRIStore
+from terrarisk.models.domain import AnalysisMode, AnalysisRequest
+from terrarisk.services.analysis import run_analysis
+from terrarisk.utils import telemetry
+
+
+def test_analysis_phases_emit_spans_and_histograms():
+    spans = InMemorySpanExporter()
+    reader = InMemoryMetricReader()
+    assert telemetry.configure_telemetry(span_exporter=spans, metric_reader=reader)
+
+    response = run_analysis(AnalysisRequest(query="Gulf hurricanes", mode=AnalysisMode.OFFLINE))
+    NRIStore.from_loader(NRILoader())
+    trace.get_tracer_provider().force_flush()
+
+    finished = spans.get_finished_spans()
+    names = {span.name for span in finished}
+    assert {"analysis.run", "planner.build_steps", "nri.rank", "boundaries.features", "report.render"} <= names
+    assert {"artifact.write", "nri.load"} <= names
+    root = next(span for span in finished if span.name == "analysis.run")
+    assert root.attributes["run_id"] == response.run_id
+    writes = [span for span in finished if span.name == "artifact.write"]
+    assert len(writes) == len(response.artifacts)
+    assert all(span.context.trace_id == root.context.trace_id for span in writes)
+
+    metrics = {
+        metric.name: metric
+        for resource in reader.get_metrics_data().resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    assert {"terrarisk.phase.duration", "terrarisk.artifact.bytes"} <= set(metrics)
+    total_bytes = sum(point.sum for point in metrics["terrarisk.artifact.bytes"].data.data_points)
+    assert total_bytes >= sum(artifact.metadata["size_bytes"] for artifact in response.artifacts)